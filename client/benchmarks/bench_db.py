@@ -0,0 +1,84 @@
+"""
+Repeatable benchmark of the DB layer.
+
+Runs DatabaseManager against a fresh embedded SQLite database by default, so
+results do not depend on a MySQL server or network. Pass --backend mysql to
+run the same workload against the server configured in .env.
+
+    python -m client.benchmarks.bench_db --users 1000 --devices 50000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the YAMS database layer.')
+    parser.add_argument('--backend', default='sqlite', choices=['sqlite', 'mysql'])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--devices', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--logins', type=int, default=50)
+    parser.add_argument('--no-cache', action='store_true', help='Disable the user info cache')
+    args = parser.parse_args(argv)
+
+    # DatabaseManager reads its configuration when it is first created
+    workdir = tempfile.mkdtemp(prefix='yams-bench-')
+    os.environ['DB_BACKEND'] = args.backend
+    os.environ.setdefault('DB_SQLITE_PATH', os.path.join(workdir, 'bench.db'))
+    # Keep hashing cheap so the numbers reflect the database, not bcrypt
+    os.environ.setdefault('BCRYPT_ROUNDS', '4')
+    if args.no_cache:
+        os.environ['USER_CACHE_TTL'] = '0'
+
+    from client.src.core.database import DatabaseManager
+
+    db = DatabaseManager()
+    results = {'backend': args.backend}
+    try:
+        run_id = int(time.time())
+        users = [{'username': f'bench{run_id}_{i}', 'password': 'secret',
+                  'email': f'bench{run_id}_{i}@example.com'} for i in range(args.users)]
+
+        (created, failures), elapsed = timed(lambda: db.register_users_bulk(users))
+        results['register_users_bulk'] = {'users': created, 'failures': len(failures),
+                                          'seconds': elapsed}
+
+        _, elapsed = timed(lambda: [db.authenticate_user(users[i % args.users]['username'], 'secret')
+                                    for i in range(args.logins)])
+        results['authenticate_user'] = {'calls': args.logins, 'seconds': elapsed}
+
+        user_id = db.authenticate_user(users[0]['username'], 'secret')['id']
+        devices = ({'user_id': user_id, 'name': f'device {i}', 'device_id': f'bench{run_id}-{i}'}
+                   for i in range(args.devices))
+        chunks, elapsed = timed(lambda: db.upsert_devices(devices))
+        results['upsert_devices'] = {'devices': args.devices, 'chunks': len(chunks),
+                                     'seconds': elapsed}
+
+        _, elapsed = timed(lambda: [db.get_user_info(user_id) for _ in range(args.lookups)])
+        results['get_user_info'] = {'calls': args.lookups, 'seconds': elapsed}
+
+        _, elapsed = timed(db.flush_pending_writes)
+        results['flush_pending_writes'] = {'seconds': elapsed}
+
+        results['statements'] = db.get_statement_stats()
+        results['user_cache'] = db.get_user_cache_stats()
+    finally:
+        db.close()
+
+    json.dump(results, sys.stdout, indent=2, default=str)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
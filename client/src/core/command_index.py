@@ -0,0 +1,84 @@
+import threading
+from collections import namedtuple
+from typing import Any, Dict, List, Optional
+
+# One command of one plugin; ``info`` is the description or metadata the plugin gave for it
+CommandEntry = namedtuple('CommandEntry', ['qualified_name', 'plugin_name', 'command', 'plugin', 'info'])
+
+
+def qualified_name(plugin_name: str, command: str) -> str:
+    """Return the name a command is dispatched by, e.g. ``Backup.run``."""
+    return f'{plugin_name}.{command}'
+
+
+class CommandIndex:
+    """Commands of all loaded plugins, keyed by qualified name.
+
+    The loader updates it as plugins are loaded, unloaded and toggled, so
+    looking up, counting and listing commands never calls plugin code.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands: Dict[str, CommandEntry] = {}
+        self._by_plugin: Dict[str, List[str]] = {}
+        self._active: Dict[str, bool] = {}
+        self._active_count = 0
+
+    def add(self, plugin_name: str, plugin: Any, commands: Any, active: bool) -> None:
+        """Index a plugin's commands, replacing any previous entries for it."""
+        if isinstance(commands, dict):
+            items = list(commands.items())
+        else:
+            items = [(command, {}) for command in commands or ()]
+        with self._lock:
+            self._remove(plugin_name)
+            names = []
+            for command, info in items:
+                name = qualified_name(plugin_name, command)
+                self._commands[name] = CommandEntry(name, plugin_name, command, plugin, info)
+                names.append(name)
+            self._by_plugin[plugin_name] = names
+            self._active[plugin_name] = active
+            if active:
+                self._active_count += len(names)
+
+    def remove(self, plugin_name: str) -> None:
+        """Drop a plugin's commands."""
+        with self._lock:
+            self._remove(plugin_name)
+
+    def set_active(self, plugin_name: str, active: bool) -> None:
+        """Record a plugin's new active state."""
+        with self._lock:
+            if plugin_name not in self._active or self._active[plugin_name] == active:
+                return
+            self._active[plugin_name] = active
+            count = len(self._by_plugin[plugin_name])
+            self._active_count += count if active else -count
+
+    def lookup(self, name: str) -> Optional[CommandEntry]:
+        """Return the entry for a qualified command name."""
+        return self._commands.get(name)
+
+    def is_active(self, plugin_name: str) -> bool:
+        return self._active.get(plugin_name, False)
+
+    def count(self, active_only: bool = True) -> int:
+        """Number of indexed commands, by default only those of active plugins."""
+        return self._active_count if active_only else len(self._commands)
+
+    def commands(self, plugin_name: Optional[str] = None, active_only: bool = True) -> List[CommandEntry]:
+        """List command entries, optionally for one plugin."""
+        with self._lock:
+            names = (self._by_plugin.get(plugin_name, []) if plugin_name is not None
+                     else list(self._commands))
+            return [self._commands[name] for name in names
+                    if not active_only or self._active[self._commands[name].plugin_name]]
+
+    def _remove(self, plugin_name: str) -> None:
+        names = self._by_plugin.pop(plugin_name, [])
+        for name in names:
+            self._commands.pop(name, None)
+        if self._active.pop(plugin_name, False):
+            self._active_count -= len(names)
@@ -1,7 +1,100 @@
 import os
-import mysql.connector
+import uuid
+import secrets
+import time
+from itertools import islice
 from dotenv import load_dotenv
-import bcrypt
+from .db_backends import create_backend
+from .db_cache import TTLCache
+from .db_instrumentation import QueryInstrumentation, instrumented
+from .db_pool import PoolExhausted
+from .db_statements import StatementRegistry
+from .db_supervisor import CONNECTED, ConnectionSupervisor
+from .metrics import metrics
+from .password_hasher import PasswordHasher
+from .replica import LocalReplica
+from .telemetry import TelemetryStore
+from .write_behind import TimestampWriteBehind
+
+# Messages for violations of the UNIQUE keys on the users table
+DUPLICATE_USER_MESSAGES = {
+    'username': "Username already exists",
+    'email': "Email already exists",
+    'client_id': "Client ID already exists"
+}
+
+# Statements prepared once per pooled connection by the StatementRegistry.
+# Written for MySQL; the storage backend translates them for its dialect.
+STATEMENTS = {
+    'user_by_username': """
+        SELECT id, username, password_hash, client_id, client_secret 
+        FROM users 
+        WHERE username = %s
+    """,
+    'touch_last_login_rehash': """
+        UPDATE users 
+        SET last_login = CURRENT_TIMESTAMP, password_hash = %s 
+        WHERE id = %s
+    """,
+    'insert_user': """
+        INSERT INTO users (username, password_hash, email, client_id, client_secret)
+        VALUES (%s, %s, %s, %s, %s)
+    """,
+    'user_info': """
+        SELECT username, email, client_id, client_secret, created_at, last_login
+        FROM users 
+        WHERE id = %s
+    """,
+    'upsert_device': """
+        INSERT INTO devices (user_id, name, device_id, last_seen, is_active)
+        VALUES (%s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP), %s)
+        ON DUPLICATE KEY UPDATE
+            name = VALUES(name),
+            last_seen = VALUES(last_seen),
+            is_active = VALUES(is_active)
+    """,
+    # Keyset pages over a user's devices; "after" variants continue from the
+    # last row of the previous page. Most recently seen first, never-seen last.
+    'devices_by_seen_first': """
+        SELECT id, name, device_id, last_seen, created_at, is_active
+        FROM devices
+        WHERE user_id = %s
+        ORDER BY last_seen DESC, id DESC
+        LIMIT %s
+    """,
+    'devices_by_seen_after': """
+        SELECT id, name, device_id, last_seen, created_at, is_active
+        FROM devices
+        WHERE user_id = %s
+            AND (last_seen < %s OR (last_seen = %s AND id < %s) OR last_seen IS NULL)
+        ORDER BY last_seen DESC, id DESC
+        LIMIT %s
+    """,
+    'devices_by_seen_after_unseen': """
+        SELECT id, name, device_id, last_seen, created_at, is_active
+        FROM devices
+        WHERE user_id = %s AND last_seen IS NULL AND id < %s
+        ORDER BY id DESC
+        LIMIT %s
+    """,
+    'devices_by_name_first': """
+        SELECT id, name, device_id, last_seen, created_at, is_active
+        FROM devices
+        WHERE user_id = %s
+        ORDER BY name, id
+        LIMIT %s
+    """,
+    'devices_by_name_after': """
+        SELECT id, name, device_id, last_seen, created_at, is_active
+        FROM devices
+        WHERE user_id = %s AND (name > %s OR (name = %s AND id > %s))
+        ORDER BY name, id
+        LIMIT %s
+    """
+}
+
+# Upper bound for iter_devices pages so memory stays flat for any fleet size
+MAX_DEVICE_PAGE_SIZE = 1000
 
 class DatabaseManager:
     _instance = None
@@ -17,121 +110,299 @@ class DatabaseManager:
             return
             
         load_dotenv()
-        self.conn = None
+        self.hasher = PasswordHasher()
+        self.user_cache = TTLCache(
+            maxsize=int(os.getenv('USER_CACHE_SIZE', '1024')),
+            ttl=float(os.getenv('USER_CACHE_TTL', '60'))
+        )
+        self.instrumentation = QueryInstrumentation(
+            slow_threshold=float(os.getenv('DB_SLOW_QUERY_MS', '200')) / 1000,
+            log_path=os.getenv('DB_SLOW_QUERY_LOG') or None
+        )
+        self.backend = None
+        self.replica = None
+        self.telemetry = None
+        self.read_retries = int(os.getenv('DB_READ_RETRIES', '1'))
+        self.read_retry_timeout = float(os.getenv('DB_READ_RETRY_TIMEOUT', '5'))
+        self.supervisor = ConnectionSupervisor(
+            lambda: self.backend.ping(),
+            reset=lambda: self.backend.reset(),
+            interval=float(os.getenv('DB_HEALTH_INTERVAL', '15')),
+            backoff_base=float(os.getenv('DB_RECONNECT_BACKOFF', '0.5')),
+            backoff_max=float(os.getenv('DB_RECONNECT_BACKOFF_MAX', '30')),
+            # Every pooled connection in use means the database is serving them
+            busy_errors=(PoolExhausted,)
+        )
         self.connect()
+        self.supervisor.start()
+        if self.replica:
+            self.replica.start()
+        # Rollups and retention cover every device, so only one machine per
+        # server (the server host or a designated client) should run them
+        if os.getenv('TELEMETRY_ROLLUPS', '0') == '1':
+            self.telemetry.start()
+
+        # Buffer last_login/last_seen/last_used updates off the request path
+        self.write_behind = TimestampWriteBehind(
+            lambda: self.backend.connection(),
+            sql=lambda query: self.backend.sql(query),
+            timestamp_ago=self.backend.timestamp_ago,
+            interval=float(os.getenv('WRITE_BEHIND_INTERVAL', '5')),
+            on_flushed=self._on_timestamps_flushed
+        )
+        self.write_behind.start()
         self._initialized = True
 
     def connect(self):
-        """Connect to the MySQL database."""
-        try:
-            self.conn = mysql.connector.connect(
-                database=os.getenv('DB_NAME', 'yams_db'),
-                user=os.getenv('DB_USER', 'root'),
-                password=os.getenv('DB_PASSWORD', ''),
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=os.getenv('DB_PORT', '3306')
+        """Set up the storage backend selected by DB_BACKEND."""
+        if self.replica:
+            self.replica.close()
+            self.replica = None
+        if self.telemetry:
+            self.telemetry.stop()
+        if self.backend:
+            self.backend.close()
+
+        self.backend = create_backend()
+        self.statements = StatementRegistry(self.backend.statements(STATEMENTS),
+                                            prepared=self.backend.prepared_statements,
+                                            observer=self.instrumentation.observe)
+        self.telemetry = TelemetryStore(
+            self.backend,
+            interval=float(os.getenv('TELEMETRY_ROLLUP_INTERVAL', '60'))
+        )
+
+        # Serve the signed-in user's rows from a local copy; pointless when
+        # the backend is already a local SQLite file.
+        if os.getenv('DB_REPLICA', '0' if self.backend.name == 'sqlite' else '1') == '1':
+            self.replica = LocalReplica(
+                self.backend,
+                STATEMENTS,
+                path=os.getenv('DB_REPLICA_PATH') or None,
+                interval=float(os.getenv('DB_REPLICA_SYNC_INTERVAL', '30')),
+                overlap=float(os.getenv('DB_REPLICA_SYNC_OVERLAP', '60')),
+                is_online=self.supervisor.is_connected,
+                observer=self.instrumentation.observe
             )
-            self.conn.autocommit = True
-        except Exception as e:
-            print(f"Database connection error: {e}")
-            self.conn = None
 
+        # Ping eagerly so configuration problems show up at startup; if the
+        # server is down now, the supervisor keeps retrying in the background.
+        if not self.supervisor.check():
+            print(f"Database connection error: {self.supervisor.last_error}")
+
+    def duplicate_key_message(self, error):
+        """Map a duplicate-key error on the users table to a user-facing message."""
+        key = self.backend.duplicate_key(error)
+        return DUPLICATE_USER_MESSAGES.get(key, str(error))
+
+    def close(self):
+        """Flush buffered writes and close all pooled connections."""
+        self.supervisor.stop()
+        self.write_behind.stop()
+        self.telemetry.stop()
+        if self.replica:
+            self.replica.close()
+        if self.backend:
+            self.backend.close()
+        self.hasher.shutdown()
+
+    def add_connection_listener(self, listener):
+        """Call ``listener(state, detail)`` whenever the connection state changes."""
+        self.supervisor.add_listener(listener)
+
+    def remove_connection_listener(self, listener):
+        """Stop reporting connection state changes to ``listener``."""
+        self.supervisor.remove_listener(listener)
+
+    def connection_state(self):
+        """Get the connection state: 'connecting', 'connected' or 'reconnecting'."""
+        return self.supervisor.state
+
+    def is_connected(self):
+        """Check whether the database answered the last health ping."""
+        return self.supervisor.state == CONNECTED
+
+    def _read(self, name, params):
+        """Run a read-only named statement, retrying it once the connection is back.
+
+        Reads are idempotent, so after a connection error the call waits up
+        to DB_READ_RETRY_TIMEOUT seconds for the supervisor to reconnect and
+        runs the statement again, DB_READ_RETRIES times at most.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.backend.connection() as conn:
+                    return self.statements.execute(conn, name, params).rows
+            except self.backend.connection_errors as e:
+                self.supervisor.report_failure(e)
+                attempt += 1
+                if attempt > self.read_retries or not self.supervisor.wait_connected(self.read_retry_timeout):
+                    raise
+                metrics.increment('db.read_retries')
+
+    @instrumented
     def authenticate_user(self, username, password):
-        """Authenticate a user and return their information."""
-        if not self.conn:
-            return None
+        """Authenticate a user and return their information.
 
+        When the server cannot be reached, users already in the local
+        replica are checked against their replicated password hash.
+        """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT id, username, password_hash, client_id, client_secret 
-                FROM users 
-                WHERE username = %s
-            """, (username,))
+            offline = False
+            try:
+                rows = self._read('user_by_username', (username,))
+            except self.backend.connection_errors:
+                if not self.replica:
+                    raise
+                rows = self.replica.read('user_by_username', (username,))
+                offline = True
             
-            result = cursor.fetchone()
-            cursor.close()
-            
-            if not result:
+            if not rows:
                 return None
             
-            user_id, username, password_hash, client_id, client_secret = result
+            user_id, username, password_hash, client_id, client_secret = rows[0]
             
-            if bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
-                # Update last login
-                cursor = self.conn.cursor()
-                cursor.execute("""
-                    UPDATE users 
-                    SET last_login = CURRENT_TIMESTAMP 
-                    WHERE id = %s
-                """, (user_id,))
-                self.conn.commit()
-                cursor.close()
-                
-                return {
-                    'id': user_id,
-                    'username': username,
-                    'client_id': client_id,
-                    'client_secret': client_secret
-                }
-            return None
+            # Verify without holding a pooled connection for the whole bcrypt run
+            if not self.hasher.verify_password(password, password_hash):
+                return None
+
+            if self.hasher.needs_rehash(password_hash) and not offline:
+                # Upgrade hashes made with an outdated work factor
+                new_hash = self.hasher.hash_password(password)
+                with self.backend.connection() as conn:
+                    self.statements.execute(conn, 'touch_last_login_rehash', (new_hash, user_id))
+                    conn.commit()
+                self.invalidate_user(user_id)
+                self._request_replica_sync()
+            else:
+                # Update last login in the background
+                self.write_behind.touch('last_login', user_id)
+
+            if self.replica:
+                self.replica.follow(user_id)
+            
+            return {
+                'id': user_id,
+                'username': username,
+                'client_id': client_id,
+                'client_secret': client_secret
+            }
                 
         except Exception as e:
             print(f"Authentication error: {e}")
+            self.instrumentation.record_error('authenticate_user')
             return None
 
+    @instrumented
     def register_user(self, username, password, email, client_id, client_secret):
         """Register a new user."""
-        if not self.conn:
-            return False, "Database connection error"
+        # Hash before borrowing a connection; uniqueness is enforced by the
+        # UNIQUE keys on users, so the insert is the only round-trip.
+        password_hash = self.hasher.hash_password(password)
 
         try:
-            cursor = self.conn.cursor()
-            
-            # Check if username exists
-            cursor.execute("SELECT id FROM users WHERE username = %s", (username,))
-            if cursor.fetchone():
-                return False, "Username already exists"
-            
-            # Check if client_id exists
-            cursor.execute("SELECT id FROM users WHERE client_id = %s", (client_id,))
-            if cursor.fetchone():
-                return False, "Client ID already exists"
-            
-            # Hash password
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            
-            # Insert new user
-            cursor.execute("""
-                INSERT INTO users (username, password_hash, email, client_id, client_secret)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (username, password_hash, email, client_id, client_secret))
-            
-            self.conn.commit()
-            cursor.close()
+            with self.backend.connection() as conn:
+                result = self.statements.execute(conn, 'insert_user',
+                                                 (username, password_hash, email, client_id, client_secret))
+                conn.commit()
+            self.invalidate_user(result.lastrowid)
             return True, None
             
+        except self.backend.integrity_error as e:
+            return False, self.duplicate_key_message(e)
+        except self.backend.connection_errors as e:
+            self.supervisor.report_failure(e)
+            self.instrumentation.record_error('register_user')
+            return False, "Database connection error"
         except Exception as e:
+            self.instrumentation.record_error('register_user')
             return False, str(e)
 
+    @instrumented
+    def register_users_bulk(self, users, batch_size=500):
+        """Register many users using batched multi-row inserts.
+
+        ``users`` is an iterable of dicts with ``username``, ``password`` and
+        ``email`` keys (e.g. rows from ``csv.DictReader``). ``client_id`` and
+        ``client_secret`` are generated when missing. Returns the number of
+        users created and a list of ``(username, error)`` for rejected rows.
+        """
+        created = 0
+        failures = []
+        users = iter(users)
+        insert_query = self.statements.sql('insert_user')
+
+        while True:
+            batch = list(islice(users, batch_size))
+            if not batch:
+                break
+
+            password_hashes = self.hasher.hash_passwords([user['password'] for user in batch])
+            rows = [
+                (user['username'], password_hash, user['email'],
+                 user.get('client_id') or str(uuid.uuid4()),
+                 user.get('client_secret') or secrets.token_urlsafe(32))
+                for user, password_hash in zip(batch, password_hashes)
+            ]
+
+            # Rows already inserted or reported, so an error fails only the rest
+            done = 0
+            try:
+                with self.backend.connection() as conn:
+                    cursor = conn.cursor()
+                    try:
+                        try:
+                            # executemany rewrites a plain INSERT into one multi-row statement
+                            self.backend.begin(conn)
+                            with self.instrumentation.statement('insert_user_batch', insert_query,
+                                                                rows[0], len(rows)):
+                                cursor.executemany(insert_query, rows)
+                            conn.commit()
+                            created += len(rows)
+                            done = len(rows)
+                        except self.backend.integrity_error:
+                            # The whole batch was rejected; retry row by row so
+                            # only the conflicting users are reported.
+                            conn.rollback()
+                            for row in rows:
+                                try:
+                                    with self.instrumentation.statement('insert_user', insert_query, row, 1):
+                                        cursor.execute(insert_query, row)
+                                    created += 1
+                                except self.backend.integrity_error as e:
+                                    failures.append((row[0], self.duplicate_key_message(e)))
+                                done += 1
+                            conn.commit()
+                    except Exception:
+                        # Never hand the connection back to the pool mid-transaction
+                        conn.rollback()
+                        raise
+                    finally:
+                        cursor.close()
+            except Exception as e:
+                print(f"Bulk registration error: {e}")
+                self.instrumentation.record_error('register_users_bulk')
+                failures.extend((row[0], str(e)) for row in rows[done:])
+
+        return created, failures
+
+    @instrumented
     def get_user_info(self, user_id):
         """Get user information including client credentials."""
-        if not self.conn:
-            return None
+        cached = self.user_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
 
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT username, email, client_id, client_secret, created_at, last_login
-                FROM users 
-                WHERE id = %s
-            """, (user_id,))
-            
-            result = cursor.fetchone()
-            cursor.close()
+            if self.replica and self.replica.has_user(user_id):
+                rows = self.replica.read('user_info', (user_id,))
+            else:
+                rows = self._read('user_info', (user_id,))
             
-            if result:
-                return {
+            if rows:
+                result = rows[0]
+                user_info = {
                     'username': result[0],
                     'email': result[1],
                     'client_id': result[2],
@@ -139,7 +410,185 @@ class DatabaseManager:
                     'created_at': result[4],
                     'last_login': result[5]
                 }
+                self.user_cache.put(user_id, user_info)
+                return dict(user_info)
             return None
             
-        except Exception:
+        except Exception as e:
+            print(f"User info error: {e}")
+            self.instrumentation.record_error('get_user_info')
+            return None
+
+    def invalidate_user(self, user_id):
+        """Drop cached information for a user after it has been written."""
+        self.user_cache.invalidate(user_id)
+
+    def get_user_cache_stats(self):
+        """Get hit/miss counters for the user info cache."""
+        return self.user_cache.stats()
+
+    def iter_devices(self, user_id, order_by='last_seen', page_size=500):
+        """Iterate over a user's devices one keyset-paginated page at a time.
+
+        ``order_by`` is ``'last_seen'`` (most recently seen first, never-seen
+        devices last) or ``'name'``. Each page is a separate bounded query that
+        continues after the last row of the previous one, so the cost per page
+        does not grow with the position in the listing the way OFFSET does,
+        and no connection is held while the caller processes a page.
+        """
+        if order_by not in ('last_seen', 'name'):
+            raise ValueError(f"Unsupported device ordering: {order_by}")
+        page_size = max(1, min(page_size, MAX_DEVICE_PAGE_SIZE))
+        read = self.replica.read if self.replica and self.replica.has_user(user_id) else self._read
+
+        last = None
+        while True:
+            if last is None:
+                name = 'devices_by_seen_first' if order_by == 'last_seen' else 'devices_by_name_first'
+                params = (user_id,)
+            elif order_by == 'name':
+                name, params = 'devices_by_name_after', (user_id, last['name'], last['name'], last['id'])
+            elif last['last_seen'] is None:
+                name, params = 'devices_by_seen_after_unseen', (user_id, last['id'])
+            else:
+                name, params = 'devices_by_seen_after', (user_id, last['last_seen'], last['last_seen'], last['id'])
+
+            try:
+                rows = read(name, params + (page_size,))
+            except Exception as e:
+                print(f"Device listing error: {e}")
+                self.instrumentation.record_error('iter_devices')
+                raise
+
+            for row in rows:
+                last = {
+                    'id': row[0],
+                    'name': row[1],
+                    'device_id': row[2],
+                    'last_seen': row[3],
+                    'created_at': row[4],
+                    'is_active': bool(row[5])
+                }
+                yield dict(last)
+
+            if len(rows) < page_size:
+                return
+
+    def touch_device(self, device_id):
+        """Record that a device was seen now; written in the next bulk flush."""
+        self.write_behind.touch('last_seen', device_id)
+
+    def touch_plugin_used(self, user_id, plugin_id):
+        """Record that a user used a plugin now; written in the next bulk flush."""
+        self.write_behind.touch('last_used', (user_id, plugin_id))
+
+    @instrumented
+    def flush_pending_writes(self):
+        """Write all buffered timestamp updates immediately."""
+        return self.write_behind.flush()
+
+    def _on_timestamps_flushed(self, target, keys):
+        """Drop cached user info once a buffered last_login has been written."""
+        self._request_replica_sync()
+        if target == 'last_login':
+            for (user_id,) in keys:
+                self.invalidate_user(user_id)
+
+    def _request_replica_sync(self):
+        """Pull our own writes into the local replica without waiting for the next interval."""
+        if self.replica:
+            self.replica.request_sync()
+
+    @instrumented
+    def upsert_devices(self, devices, chunk_size=None):
+        """Insert or update device records in chunked batches.
+
+        ``devices`` is any iterable of dicts with ``user_id``, ``name`` and
+        ``device_id`` keys and optional ``last_seen`` (defaults to now) and
+        ``is_active`` (defaults to True). It is consumed one chunk at a time,
+        so generators are streamed. Each chunk is written as one multi-row
+        upsert (``INSERT ... ON DUPLICATE KEY UPDATE`` on MySQL) in its own
+        transaction.
+        Returns a list with the row count, duration and any error per chunk.
+        """
+        chunk_size = chunk_size or int(os.getenv('DEVICE_UPSERT_CHUNK_SIZE', '500'))
+        upsert_query = self.statements.sql('upsert_device')
+        devices = iter(devices)
+        chunks = []
+
+        while True:
+            rows = [
+                (device['user_id'], device['name'], device['device_id'],
+                 device.get('last_seen'), device.get('is_active', True))
+                for device in islice(devices, chunk_size)
+            ]
+            if not rows:
+                break
+
+            chunk = {'rows': len(rows), 'seconds': 0.0, 'error': None}
+            start = time.perf_counter()
+            try:
+                with self.backend.connection() as conn:
+                    self.backend.begin(conn)
+                    cursor = conn.cursor()
+                    try:
+                        with self.instrumentation.statement('upsert_device_batch', upsert_query,
+                                                            rows[0], len(rows)):
+                            cursor.executemany(upsert_query, rows)
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                    finally:
+                        cursor.close()
+            except Exception as e:
+                print(f"Device upsert error: {e}")
+                self.instrumentation.record_error('upsert_devices')
+                chunk['error'] = str(e)
+            chunk['seconds'] = time.perf_counter() - start
+            metrics.record('devices.upsert_chunk', chunk['seconds'])
+            chunks.append(chunk)
+
+        self._request_replica_sync()
+        return chunks
+
+    @instrumented
+    def record_device_metrics(self, samples):
+        """Store raw CPU/memory/disk samples for devices."""
+        return self.telemetry.record_samples(samples)
+
+    @instrumented
+    def get_device_metrics(self, device_id, start, end, max_points=500):
+        """Get a device's metric history between two epoch times from the best-fitting rollup."""
+        try:
+            return self.telemetry.query(device_id, start, end, max_points)
+        except Exception as e:
+            print(f"Device metrics error: {e}")
+            self.instrumentation.record_error('get_device_metrics')
             return None
+
+    def get_statement_stats(self):
+        """Get execution counts and latencies for the prepared statements."""
+        return self.statements.stats()
+
+    def get_query_stats(self):
+        """Get latency histograms, row counts and error counts per statement and call."""
+        return self.instrumentation.stats()
+
+    def get_slow_queries(self):
+        """Get the most recent statements over DB_SLOW_QUERY_MS, with redacted parameters."""
+        return self.instrumentation.slow_queries()
+
+    def reset_query_stats(self):
+        """Clear the query statistics and the slow-query log."""
+        self.instrumentation.reset()
+
+    def sync_replica(self, user_id=None):
+        """Pull server changes into the local replica now; returns rows copied per table."""
+        if not self.replica:
+            return {}
+        return self.replica.sync(user_id)
+
+    def get_backend_stats(self):
+        """Get connection statistics from the storage backend."""
+        return self.backend.stats()
@@ -0,0 +1,287 @@
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, ContextManager, Dict, Optional, Sequence
+import mysql.connector
+from mysql.connector import errorcode
+from .db_pool import ConnectionPool, PoolConnectError
+
+SQLITE_SCHEMA_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', '..', 'database', 'schema_sqlite.sql'))
+
+
+class StorageBackend(ABC):
+    """Connection handling and SQL dialect for one database engine.
+
+    Queries in the DB layer are written for MySQL with ``%s`` placeholders;
+    ``sql`` translates them and ``statement_overrides`` replaces statements
+    that have no direct equivalent in the backend's dialect.
+    """
+
+    name = ''
+    # Whether StatementRegistry should keep server-side prepared cursors
+    prepared_statements = False
+    # Exception raised for constraint violations
+    integrity_error = Exception
+    # SQL expression for "now minus %s microseconds"
+    timestamp_ago = ''
+    # Whether tables can be range-partitioned (used for telemetry retention)
+    supports_partitioning = False
+    # Exceptions meaning the database could not be reached, as opposed to
+    # errors in the statement itself. A busy pool (PoolExhausted) is not an
+    # outage and must not trigger reconnects or replica fallback.
+    connection_errors = (PoolConnectError,)
+    statement_overrides: Dict[str, str] = {}
+
+    def sql(self, query: str) -> str:
+        """Translate a MySQL-style query to this backend's dialect."""
+        return query
+
+    def statements(self, statements: Dict[str, str]) -> Dict[str, str]:
+        """Translate a set of named statements, applying dialect overrides."""
+        return {name: self.sql(self.statement_overrides.get(name, query))
+                for name, query in statements.items()}
+
+    @abstractmethod
+    def upsert_clause(self, key_columns: Sequence[str], update_columns: Sequence[str]) -> str:
+        """Return the clause that turns an INSERT into an upsert on ``key_columns``."""
+        pass
+
+    @abstractmethod
+    def connection(self) -> ContextManager:
+        """Borrow a connection for the duration of a ``with`` block."""
+        pass
+
+    @abstractmethod
+    def begin(self, conn: Any) -> None:
+        """Start an explicit transaction on ``conn``."""
+        pass
+
+    @abstractmethod
+    def duplicate_key(self, error: Exception) -> Optional[str]:
+        """Return the violated unique key's name for duplicate-key errors, else None."""
+        pass
+
+    def ping(self) -> None:
+        """Run a trivial query; raises if the database cannot be reached."""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('SELECT 1')
+                cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def reset(self) -> None:
+        """Drop idle connections so the next borrow opens a fresh one."""
+        pass
+
+    def close(self) -> None:
+        """Release all connections."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection statistics."""
+        return {'backend': self.name}
+
+
+class MySQLBackend(StorageBackend):
+    """MySQL server accessed through a pool of mysql.connector connections."""
+
+    name = 'mysql'
+    prepared_statements = True
+    integrity_error = mysql.connector.IntegrityError
+    timestamp_ago = 'CURRENT_TIMESTAMP - INTERVAL %s MICROSECOND'
+    supports_partitioning = True
+    connection_errors = (PoolConnectError, mysql.connector.errors.OperationalError,
+                         mysql.connector.errors.InterfaceError)
+
+    def __init__(self):
+        self.pool = ConnectionPool(
+            self._create_connection,
+            size=int(os.getenv('DB_POOL_SIZE', '5')),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            validate=lambda conn: conn.is_connected(),
+            ping_interval=float(os.getenv('DB_POOL_PING_INTERVAL', '30'))
+        )
+
+    def _create_connection(self):
+        """Open a new MySQL connection from the environment settings."""
+        conn = mysql.connector.connect(
+            database=os.getenv('DB_NAME', 'yams_db'),
+            user=os.getenv('DB_USER', 'root'),
+            password=os.getenv('DB_PASSWORD', ''),
+            host=os.getenv('DB_HOST', 'localhost'),
+            port=os.getenv('DB_PORT', '3306'),
+            connection_timeout=int(os.getenv('DB_CONNECT_TIMEOUT', '10'))
+        )
+        conn.autocommit = True
+        return conn
+
+    def upsert_clause(self, key_columns: Sequence[str], update_columns: Sequence[str]) -> str:
+        assignments = ', '.join(f'{column} = VALUES({column})' for column in update_columns)
+        return f'ON DUPLICATE KEY UPDATE {assignments}'
+
+    def connection(self) -> ContextManager:
+        return self.pool.connection()
+
+    def begin(self, conn: Any) -> None:
+        conn.start_transaction()
+
+    def duplicate_key(self, error: Exception) -> Optional[str]:
+        if getattr(error, 'errno', None) != errorcode.ER_DUP_ENTRY:
+            return None
+        # e.g. "Duplicate entry 'bob' for key 'users.username'"
+        match = re.search(r"for key '(?:\w+\.)?(\w+)'", getattr(error, 'msg', None) or str(error))
+        return match.group(1) if match else ''
+
+    def reset(self) -> None:
+        self.pool.clear_idle()
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.pool.stats(), backend=self.name)
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded SQLite database for single-user installs and benchmarks.
+
+    Each thread gets its own connection to the shared database file, which
+    runs in WAL mode so readers never block the writer. The schema from
+    ``schema_path`` (default ``database/schema_sqlite.sql``) is applied when
+    the first connection opens.
+    """
+
+    name = 'sqlite'
+    integrity_error = sqlite3.IntegrityError
+    timestamp_ago = "datetime('now', '-' || (%s / 1000000.0) || ' seconds')"
+    statement_overrides = {
+        'upsert_device': """
+            INSERT INTO devices (user_id, name, device_id, last_seen, is_active)
+            VALUES (%s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP), %s)
+            ON CONFLICT (device_id) DO UPDATE SET
+                name = excluded.name,
+                last_seen = excluded.last_seen,
+                is_active = excluded.is_active
+        """
+    }
+
+    PRAGMAS = (
+        'PRAGMA journal_mode = WAL',
+        'PRAGMA synchronous = NORMAL',
+        'PRAGMA foreign_keys = ON',
+        'PRAGMA temp_store = MEMORY',
+        'PRAGMA cache_size = -20000',      # 20 MB page cache
+        'PRAGMA mmap_size = 268435456'     # 256 MB memory-mapped I/O
+    )
+
+    def __init__(self, path: Optional[str] = None, schema_path: str = SQLITE_SCHEMA_PATH):
+        self.schema_path = schema_path
+        path = path or os.getenv('DB_SQLITE_PATH') or os.path.join(
+            os.path.expanduser('~'), '.yams', 'yams.db')
+        if path == ':memory:':
+            # Per-thread connections need a named shared-cache database to see
+            # the same data; the anchor connection keeps it alive.
+            self.path, self._uri = 'file:yams_memory?mode=memory&cache=shared', True
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.path, self._uri = path, False
+        self.busy_timeout = float(os.getenv('DB_SQLITE_BUSY_TIMEOUT', '5'))
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._schema_applied = False
+        self._anchor = self._open() if self._uri else None
+
+    def sql(self, query: str) -> str:
+        return query.replace('%s', '?')
+
+    def upsert_clause(self, key_columns: Sequence[str], update_columns: Sequence[str]) -> str:
+        assignments = ', '.join(f'{column} = excluded.{column}' for column in update_columns)
+        return f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {assignments}"
+
+    @contextmanager
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def begin(self, conn: Any) -> None:
+        conn.execute('BEGIN')
+
+    def duplicate_key(self, error: Exception) -> Optional[str]:
+        # e.g. "UNIQUE constraint failed: users.username"
+        match = re.search(r'UNIQUE constraint failed: \w+\.(\w+)', str(error))
+        return match.group(1) if match else None
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'backend': self.name, 'path': self.path, 'open': len(self._connections)}
+
+    def _open(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(
+                self.path,
+                uri=self._uri,
+                timeout=self.busy_timeout,
+                # Autocommit like the MySQL connections; batches use begin()
+                isolation_level=None,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                # Connections are used by one thread but closed from another
+                check_same_thread=False
+            )
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+        except sqlite3.Error as e:
+            raise PoolConnectError(f"Could not open SQLite database {self.path}: {e}") from e
+
+        with self._lock:
+            self._connections.append(conn)
+            if not self._schema_applied:
+                with open(self.schema_path, encoding='utf-8') as f:
+                    conn.executescript(f.read())
+                self._schema_applied = True
+        return conn
+
+
+def _convert_timestamp(value: bytes) -> datetime:
+    return datetime.fromisoformat(value.decode('utf-8'))
+
+
+# Return TIMESTAMP columns as datetime like mysql.connector does, without
+# relying on sqlite3's deprecated default converters.
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('TIMESTAMP', _convert_timestamp)
+
+
+def create_backend(name: Optional[str] = None) -> StorageBackend:
+    """Create the storage backend named by ``name`` or ``DB_BACKEND``."""
+    name = (name or os.getenv('DB_BACKEND', 'mysql')).lower()
+    if name == 'mysql':
+        return MySQLBackend()
+    if name == 'sqlite':
+        return SQLiteBackend()
+    raise ValueError(f"Unknown database backend: {name}")
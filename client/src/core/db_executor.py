@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Set
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+
+class QueryTask(QObject):
+    """Handle for a database call running on the executor's worker pool.
+
+    The signals are always delivered on the thread that created the task
+    (the GUI thread for UI callers). A cancelled task emits nothing.
+    """
+
+    succeeded = pyqtSignal(object)  # Emitted with the call's return value
+    failed = pyqtSignal(str)        # Emitted with the error message
+    finished = pyqtSignal()         # Emitted after succeeded/failed
+
+    _completed = pyqtSignal()
+
+    def __init__(self, future: Future, on_done: Callable[['QueryTask'], None]):
+        super().__init__()
+        self.future = future
+        self._on_done = on_done
+        self._cancelled = False
+
+        # Queued so _deliver runs on this object's thread, not the worker's
+        self._completed.connect(self._deliver, Qt.ConnectionType.QueuedConnection)
+        future.add_done_callback(lambda _: self._completed.emit())
+
+    def cancel(self) -> None:
+        """Cancel the call; if it is already running its result is discarded."""
+        self._cancelled = True
+        self.future.cancel()
+
+    def is_cancelled(self) -> bool:
+        """Check whether the task has been cancelled."""
+        return self._cancelled
+
+    def _deliver(self) -> None:
+        try:
+            if self._cancelled or self.future.cancelled():
+                return
+            error = self.future.exception()
+            if error is not None:
+                self.failed.emit(str(error))
+            else:
+                self.succeeded.emit(self.future.result())
+            self.finished.emit()
+        finally:
+            self._on_done(self)
+
+
+class DatabaseExecutor:
+    """Runs blocking database calls on a worker pool, off the GUI thread."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DatabaseExecutor, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        workers = int(os.getenv('DB_EXECUTOR_WORKERS', os.getenv('DB_POOL_SIZE', '5')))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yams-db')
+        # Keep tasks referenced until delivered so Qt does not drop them
+        self._pending: Set[QueryTask] = set()
+        self._initialized = True
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> QueryTask:
+        """Run ``fn(*args, **kwargs)`` on a worker and return its task.
+
+        Results are delivered through the event loop, so connecting to the
+        task's signals right after ``submit`` returns never misses them.
+        """
+        task = QueryTask(self._executor.submit(fn, *args, **kwargs), self._pending.discard)
+        self._pending.add(task)
+        return task
+
+    def cancel_all(self) -> None:
+        """Cancel every task that has not been delivered yet."""
+        for task in list(self._pending):
+            task.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel queued calls and stop the worker pool."""
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
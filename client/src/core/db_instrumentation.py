@@ -0,0 +1,152 @@
+import functools
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from .metrics import LatencyStats
+
+
+def redact_params(params: Sequence[Any]) -> List[str]:
+    """Replace query parameters with their type so no values reach the log."""
+    return ['NULL' if param is None else f'<{type(param).__name__}>' for param in params]
+
+
+def _normalize_sql(sql: str) -> str:
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+class QueryInstrumentation:
+    """Latency, row and error accounting for database statements and operations.
+
+    Statements are individual SQL executions, reported by the
+    StatementRegistry or by batch writers; operations are whole
+    DatabaseManager calls, which may run several statements. Statements
+    slower than ``slow_threshold`` seconds are kept in a bounded slow-query
+    log with redacted parameters and, if ``log_path`` is set, appended to
+    that file as JSON lines.
+    """
+
+    def __init__(self, slow_threshold: float = 0.2, slow_log_size: int = 100,
+                 log_path: Optional[str] = None):
+        self.slow_threshold = slow_threshold
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._statements: Dict[str, Dict[str, Any]] = {}
+        self._operations: Dict[str, Dict[str, Any]] = {}
+        self._slow_log = deque(maxlen=slow_log_size)
+
+    def observe(self, name: str, sql: str, params: Sequence[Any], seconds: float,
+                rows: int = 0, error: Optional[BaseException] = None) -> None:
+        """Record one statement execution."""
+        slow = seconds >= self.slow_threshold
+        with self._lock:
+            entry = self._entry(self._statements, name)
+            entry['latency'].record(seconds)
+            entry['rows'] += max(rows, 0)
+            entry['errors'] += error is not None
+            entry['slow'] += slow
+        if slow:
+            self._log_slow(name, sql, params, seconds, rows, error)
+
+    @contextmanager
+    def statement(self, name: str, sql: str, params: Sequence[Any] = (), rows: int = 0):
+        """Time a statement run outside the StatementRegistry, e.g. an executemany batch."""
+        error = None
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.observe(name, sql, params, time.perf_counter() - start, rows, error)
+
+    @contextmanager
+    def operation(self, name: str):
+        """Time the ``with`` block as operation ``name``, counting exceptions as errors."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record_error(name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._entry(self._operations, name)['latency'].record(elapsed)
+
+    def record_error(self, name: str) -> None:
+        """Count an error the operation ``name`` handled instead of raising."""
+        with self._lock:
+            self._entry(self._operations, name)['errors'] += 1
+
+    def slow_queries(self) -> List[Dict[str, Any]]:
+        """Return the most recent slow statements, oldest first."""
+        with self._lock:
+            return list(self._slow_log)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return latency histograms, row counts and error counts."""
+        with self._lock:
+            return {
+                'slow_threshold_ms': self.slow_threshold * 1000,
+                'statements': {
+                    name: dict(entry['latency'].snapshot(), rows=entry['rows'],
+                               errors=entry['errors'], slow=entry['slow'])
+                    for name, entry in self._statements.items()
+                },
+                'operations': {
+                    name: dict(entry['latency'].snapshot(), errors=entry['errors'])
+                    for name, entry in self._operations.items()
+                },
+                'slow_queries': list(self._slow_log)
+            }
+
+    def reset(self) -> None:
+        """Drop all collected statistics and the slow-query log."""
+        with self._lock:
+            self._statements.clear()
+            self._operations.clear()
+            self._slow_log.clear()
+
+    @staticmethod
+    def _entry(entries: Dict[str, Dict[str, Any]], name: str) -> Dict[str, Any]:
+        entry = entries.get(name)
+        if entry is None:
+            entry = entries[name] = {'latency': LatencyStats(), 'rows': 0, 'errors': 0, 'slow': 0}
+        return entry
+
+    def _log_slow(self, name: str, sql: str, params: Sequence[Any], seconds: float,
+                  rows: int, error: Optional[BaseException]) -> None:
+        record = {
+            'at': datetime.now(timezone.utc).isoformat(),
+            'name': name,
+            'ms': round(seconds * 1000, 3),
+            'rows': rows,
+            'sql': _normalize_sql(sql),
+            'params': redact_params(params),
+            'error': type(error).__name__ if error is not None else None
+        }
+        with self._lock:
+            self._slow_log.append(record)
+        print(f"Slow query {name}: {record['ms']:.1f} ms, params {record['params']}")
+
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError as e:
+                print(f"Slow query log error: {e}")
+
+
+def instrumented(method):
+    """Time a DatabaseManager method as an operation named after it."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.instrumentation.operation(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,151 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+
+class PoolError(Exception):
+    """Raised when a connection cannot be borrowed from the pool."""
+
+
+class PoolConnectError(PoolError):
+    """The database refused or failed to open a new connection."""
+
+
+class PoolExhausted(PoolError):
+    """Every connection stayed in use for the whole borrow timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections with borrow/return semantics.
+
+    Connections are created lazily by ``factory`` up to ``size``. A borrowed
+    connection that has been idle for longer than ``ping_interval`` seconds is
+    checked with ``validate`` first; dead connections are dropped and replaced
+    with a fresh one, so callers never see a connection that went away while
+    it was sitting in the pool.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 5, timeout: float = 10.0,
+                 validate: Optional[Callable[[Any], bool]] = None, ping_interval: float = 30.0):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self._factory = factory
+        self._validate = validate
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        # LIFO keeps the most recently used connections hot and lets the
+        # others age out on the server side instead of being cycled evenly.
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def acquire(self) -> Any:
+        """Borrow a live connection, waiting up to ``timeout`` seconds."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if self._closed:
+                raise PoolError("Connection pool is closed")
+
+            try:
+                conn, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                if self._reserve_slot():
+                    return self._open()
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted(f"No database connection available after {self.timeout}s")
+                try:
+                    conn, returned_at = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+
+            if time.monotonic() - returned_at < self.ping_interval or self._is_alive(conn):
+                return conn
+
+            # Stale connection: throw it away and open a replacement in its slot
+            self._close_quietly(conn)
+            return self._open()
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Return a borrowed connection to the pool, or drop it if ``discard``."""
+        if discard or self._closed:
+            self._close_quietly(conn)
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a ``with`` block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, discard=not self._is_alive(conn))
+            raise
+        else:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close all idle connections and refuse further borrows."""
+        self._closed = True
+        self.clear_idle()
+
+    def clear_idle(self) -> None:
+        """Close all idle connections, e.g. after the server went away."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(conn)
+            with self._lock:
+                self._created -= 1
+
+    def stats(self) -> dict:
+        """Return the current pool occupancy."""
+        idle = self._idle.qsize()
+        return {
+            'size': self.size,
+            'open': self._created,
+            'idle': idle,
+            'in_use': self._created - idle
+        }
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+            return False
+
+    def _open(self) -> Any:
+        """Open a connection for an already reserved slot."""
+        try:
+            return self._factory()
+        except Exception as e:
+            with self._lock:
+                self._created -= 1
+            raise PoolConnectError(f"Could not open database connection: {e}") from e
+
+    def _is_alive(self, conn: Any) -> bool:
+        if self._validate is None:
+            return True
+        try:
+            return bool(self._validate(conn))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
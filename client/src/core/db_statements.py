@@ -0,0 +1,123 @@
+import threading
+import time
+import weakref
+from collections import namedtuple
+from typing import Any, Callable, Dict, Optional, Sequence
+from .metrics import LatencyStats
+
+
+StatementResult = namedtuple('StatementResult', ['rows', 'rowcount', 'lastrowid'])
+
+
+class StatementRegistry:
+    """Named SQL statements prepared once per connection and then reused.
+
+    MySQL prepared cursors keep their server-side statement as long as they
+    are handed the identical query string object, so each connection keeps
+    one prepared cursor per statement name. With ``prepared=False`` a plain
+    cursor is used per call, for drivers that cache statements themselves
+    (sqlite3). Execution counts, prepare counts and latencies are tracked
+    per name; ``observer`` is additionally called after every execution with
+    the name, SQL, parameters, elapsed seconds, row count and any error.
+    """
+
+    def __init__(self, statements: Dict[str, str], prepared: bool = True,
+                 observer: Optional[Callable[..., None]] = None):
+        self._statements = dict(statements)
+        self.prepared = prepared
+        self.observer = observer
+        # connection -> {statement name: prepared cursor}; entries disappear
+        # with the connection when the pool drops it.
+        self._cursors = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._latency: Dict[str, LatencyStats] = {name: LatencyStats() for name in self._statements}
+        self._prepares: Dict[str, int] = {name: 0 for name in self._statements}
+        self._errors: Dict[str, int] = {name: 0 for name in self._statements}
+
+    def register(self, name: str, sql: str) -> None:
+        """Add or replace a named statement."""
+        with self._lock:
+            self._statements[name] = sql
+            self._latency[name] = LatencyStats()
+            self._prepares[name] = 0
+            self._errors[name] = 0
+            # Cursors prepared for an older version of the statement are stale
+            for cursors in self._cursors.values():
+                cursor = cursors.pop(name, None)
+                if cursor is not None:
+                    self._close_quietly(cursor)
+
+    def sql(self, name: str) -> str:
+        """Return the SQL text of a named statement."""
+        return self._statements[name]
+
+    def execute(self, conn: Any, name: str, params: Sequence[Any] = ()) -> StatementResult:
+        """Execute a named statement on ``conn`` and fetch its result."""
+        sql = self._statements[name]
+        params = tuple(params)
+        cursor = self._cursor(conn, name)
+        result = None
+        error = None
+        start = time.perf_counter()
+        try:
+            # Passing the same string object lets the cursor skip re-preparing
+            cursor.execute(sql, params)
+            # Prepared cursors must be drained before they can run again
+            rows = cursor.fetchall() if cursor.description is not None else []
+            result = StatementResult(rows, cursor.rowcount, cursor.lastrowid)
+        except Exception as e:
+            error = e
+            with self._lock:
+                self._errors[name] += 1
+                if self.prepared:
+                    self._forget(conn, name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._latency[name].record(elapsed)
+            if not self.prepared:
+                cursor.close()
+            if self.observer:
+                row_count = 0
+                if result is not None:
+                    row_count = len(result.rows) if result.rows else result.rowcount
+                self.observer(name, sql, params, elapsed, row_count, error)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return execution, prepare and error counts plus latencies per statement."""
+        with self._lock:
+            return {
+                name: dict(self._latency[name].snapshot(),
+                           prepares=self._prepares[name],
+                           errors=self._errors[name])
+                for name in self._statements
+            }
+
+    def _cursor(self, conn: Any, name: str) -> Any:
+        if not self.prepared:
+            return conn.cursor()
+        with self._lock:
+            cursors = self._cursors.get(conn)
+            if cursors is None:
+                cursors = self._cursors[conn] = {}
+            cursor = cursors.get(name)
+            if cursor is None:
+                cursor = cursors[name] = conn.cursor(prepared=True)
+                self._prepares[name] += 1
+            return cursor
+
+    def _forget(self, conn: Any, name: str) -> None:
+        cursors = self._cursors.get(conn)
+        if cursors:
+            cursor = cursors.pop(name, None)
+            if cursor is not None:
+                self._close_quietly(cursor)
+
+    @staticmethod
+    def _close_quietly(cursor: Any) -> None:
+        try:
+            cursor.close()
+        except Exception:
+            pass
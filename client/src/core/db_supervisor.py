@@ -0,0 +1,154 @@
+import random
+import threading
+from typing import Callable, List, Optional, Tuple, Type
+from .metrics import metrics
+
+CONNECTING = 'connecting'
+CONNECTED = 'connected'
+RECONNECTING = 'reconnecting'
+
+
+class ConnectionSupervisor:
+    """Watches database health and drives reconnects after an outage.
+
+    While connected, ``ping`` runs every ``interval`` seconds. When a ping
+    fails, or a caller reports a connection error, the supervisor calls
+    ``reset`` to drop stale connections and retries ``ping`` with exponential
+    backoff and jitter (``backoff_base`` doubling up to ``backoff_max``
+    seconds) until it succeeds. Listeners are called with the new state and
+    a short description on every state change, from the supervisor's thread.
+    A ping failing with one of ``busy_errors`` (e.g. no free pooled
+    connection) means the database is busy, not down, and counts as healthy.
+    """
+
+    def __init__(self, ping: Callable[[], None], reset: Optional[Callable[[], None]] = None,
+                 interval: float = 15.0, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 busy_errors: Tuple[Type[Exception], ...] = ()):
+        self.ping = ping
+        self.reset = reset
+        self.busy_errors = busy_errors
+        self.interval = interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.state = CONNECTING
+        self.detail = ''
+        self.attempts = 0
+        self.last_error = ''
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+        self._connected = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Call ``listener(state, detail)`` on every state change."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Stop notifying ``listener``."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def is_connected(self) -> bool:
+        """Check whether the last ping succeeded."""
+        return self._connected.is_set()
+
+    def wait_connected(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for the connection to be healthy."""
+        return self._connected.wait(timeout)
+
+    def report_failure(self, error: Exception) -> None:
+        """Tell the supervisor a caller hit a connection error."""
+        self.last_error = str(error)
+        if self.state == CONNECTED:
+            self._lost()
+        self._wake.set()
+
+    def check(self) -> bool:
+        """Ping once now and update the state; returns whether it succeeded."""
+        try:
+            self.ping()
+        except self.busy_errors:
+            metrics.increment('db.ping_busy')
+        except Exception as e:
+            self.last_error = str(e)
+            if self.state == CONNECTED:
+                self._lost()
+            return False
+        if self.state != CONNECTED:
+            if self.state == RECONNECTING:
+                metrics.increment('db.reconnects')
+            self.attempts = 0
+            self._set_state(CONNECTED, '')
+        return True
+
+    def start(self) -> None:
+        """Start the background health thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='yams-db-supervisor', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background health thread."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def backoff_delay(self) -> float:
+        """Delay before the next reconnect attempt, with "equal jitter"."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** self.attempts))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.state == CONNECTED:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+                # A caller may have reported a failure while we were waiting
+                if self.state == CONNECTED and not self._stop.is_set():
+                    self.check()
+                continue
+
+            # Connecting or reconnecting: start over with fresh connections
+            if self.reset:
+                try:
+                    self.reset()
+                except Exception as e:
+                    print(f"Database reset error: {e}")
+            if self.check():
+                continue
+
+            delay = self.backoff_delay()
+            self.attempts += 1
+            self._set_state(RECONNECTING,
+                            f"{self.last_error} (retry {self.attempts} in {delay:.1f}s)")
+            self._stop.wait(delay)
+
+    def _lost(self) -> None:
+        print(f"Database connection lost: {self.last_error}")
+        metrics.increment('db.connection_lost')
+        self._set_state(RECONNECTING, self.last_error)
+
+    def _set_state(self, state: str, detail: str) -> None:
+        with self._lock:
+            changed = (state, detail) != (self.state, self.detail)
+            self.state, self.detail = state, detail
+            listeners = list(self._listeners)
+        if state == CONNECTED:
+            self._connected.set()
+        else:
+            self._connected.clear()
+        if not changed:
+            return
+        for listener in listeners:
+            try:
+                listener(state, detail)
+            except Exception as e:
+                print(f"Database state listener error: {e}")
@@ -0,0 +1,88 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class LatencyStats:
+    """Running latency summary with a fixed-bucket histogram."""
+
+    # Upper bounds of the histogram buckets in milliseconds
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def record(self, seconds: float) -> None:
+        """Add one observation, given in seconds."""
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.buckets[bisect.bisect_left(self.BUCKETS_MS, seconds * 1000)] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return the summary in milliseconds."""
+        labels = [f'<={bound}ms' for bound in self.BUCKETS_MS] + [f'>{self.BUCKETS_MS[-1]}ms']
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'avg_ms': (self.total / self.count * 1000) if self.count else 0.0,
+            'min_ms': (self.min or 0.0) * 1000,
+            'max_ms': (self.max or 0.0) * 1000,
+            'histogram': dict(zip(labels, self.buckets))
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe collection of named latency stats and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, LatencyStats] = {}
+        self._counters: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a latency observation for ``name``."""
+        with self._lock:
+            stats = self._latencies.get(name)
+            if stats is None:
+                stats = self._latencies[name] = LatencyStats()
+            stats.record(seconds)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increase the counter ``name`` by ``amount``."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str):
+        """Record how long the ``with`` block took under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """Return a copy of all latency stats and counters."""
+        with self._lock:
+            return {
+                'latencies': {name: stats.snapshot() for name, stats in self._latencies.items()},
+                'counters': dict(self._counters)
+            }
+
+    def reset(self) -> None:
+        """Drop all collected metrics."""
+        with self._lock:
+            self._latencies.clear()
+            self._counters.clear()
+
+
+# Process-wide registry shared by the core services
+metrics = MetricsRegistry()
@@ -0,0 +1,210 @@
+import os
+import re
+import sys
+from collections import namedtuple
+from typing import Callable, ContextManager, Dict, List, Optional
+
+DEFAULT_MIGRATIONS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', '..', 'database', 'migrations'))
+
+Migration = namedtuple('Migration', ['version', 'name', 'path'])
+
+# Dashboard queries and the index each one is expected to use. Sample
+# parameters only need to be of the right type for EXPLAIN.
+INDEX_PLAN = [
+    {
+        'name': 'devices_by_owner',
+        'query': """
+            SELECT id, name, last_seen, is_active FROM devices
+            WHERE user_id = %s ORDER BY last_seen DESC
+        """,
+        'params': (1,),
+        'index': 'idx_devices_owner_seen'
+    },
+    {
+        'name': 'devices_recently_seen',
+        'query': """
+            SELECT id, user_id, last_seen FROM devices
+            WHERE last_seen >= NOW() - INTERVAL %s MINUTE ORDER BY last_seen DESC
+        """,
+        'params': (5,),
+        'index': 'idx_devices_last_seen'
+    },
+    {
+        'name': 'plugin_entitlements',
+        'query': """
+            SELECT user_id FROM user_plugins
+            WHERE plugin_id = %s AND is_installed = true
+        """,
+        'params': (1,),
+        'index': 'idx_user_plugins_plugin'
+    },
+    {
+        'name': 'devices_keyset_by_seen',
+        'query': """
+            SELECT id, name, device_id, last_seen, created_at, is_active FROM devices
+            WHERE user_id = %s AND (last_seen < NOW() OR (last_seen = NOW() AND id < %s)
+                OR last_seen IS NULL)
+            ORDER BY last_seen DESC, id DESC LIMIT %s
+        """,
+        'params': (1, 1000, 500),
+        'index': 'idx_devices_owner_keyset'
+    },
+    {
+        'name': 'devices_keyset_by_name',
+        'query': """
+            SELECT id, name, device_id, last_seen, created_at, is_active FROM devices
+            WHERE user_id = %s AND (name > %s OR (name = %s AND id > %s))
+            ORDER BY name, id LIMIT %s
+        """,
+        'params': (1, 'a', 'a', 1, 500),
+        'index': 'idx_devices_owner_name'
+    }
+]
+
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def split_statements(sql: str) -> List[str]:
+    """Split a migration script into statements, dropping ``--`` comment lines."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+class MigrationRunner:
+    """Applies numbered SQL migrations and records the schema version.
+
+    Migrations are ``NNN_description.sql`` files applied in version order.
+    Each applied version is recorded in ``schema_migrations``. MySQL commits
+    DDL implicitly, so a version is recorded only after all its statements
+    have succeeded; a failed migration is retried from the start next time.
+    """
+
+    def __init__(self, connection: Callable[[], ContextManager],
+                 migrations_dir: str = DEFAULT_MIGRATIONS_DIR):
+        self.connection = connection
+        self.migrations_dir = migrations_dir
+
+    def discover(self) -> List[Migration]:
+        """List the migration files, ordered by version."""
+        migrations = []
+        for filename in os.listdir(self.migrations_dir):
+            match = MIGRATION_FILE_PATTERN.match(filename)
+            if match:
+                migrations.append(Migration(int(match.group(1)), match.group(2),
+                                            os.path.join(self.migrations_dir, filename)))
+        migrations.sort(key=lambda migration: migration.version)
+
+        versions = [migration.version for migration in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError(f"Duplicate migration versions in {self.migrations_dir}")
+        return migrations
+
+    def current_version(self) -> int:
+        """Get the highest applied schema version, 0 for a fresh database."""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                self._ensure_version_table(cursor)
+                cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+                return cursor.fetchone()[0]
+            finally:
+                cursor.close()
+
+    def pending(self) -> List[Migration]:
+        """List migrations that have not been applied yet."""
+        current = self.current_version()
+        return [migration for migration in self.discover() if migration.version > current]
+
+    def migrate(self, target: Optional[int] = None) -> List[Migration]:
+        """Apply pending migrations up to ``target`` (default: all)."""
+        applied = []
+        for migration in self.pending():
+            if target is not None and migration.version > target:
+                break
+            with open(migration.path, encoding='utf-8') as f:
+                statements = split_statements(f.read())
+
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    for statement in statements:
+                        cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                        (migration.version, migration.name)
+                    )
+                    conn.commit()
+                finally:
+                    cursor.close()
+            print(f"Applied migration {migration.version:03d}_{migration.name}")
+            applied.append(migration)
+        return applied
+
+    def check_index_plan(self, plan: Optional[List[Dict]] = None) -> List[Dict]:
+        """EXPLAIN each planned query and report whether it uses its index."""
+        results = []
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                for entry in plan or INDEX_PLAN:
+                    cursor.execute('EXPLAIN ' + entry['query'].strip(), entry['params'])
+                    rows = cursor.fetchall()
+                    used = [row.get('key') for row in rows if row.get('key')]
+                    results.append({
+                        'name': entry['name'],
+                        'expected_index': entry['index'],
+                        'used_indexes': used,
+                        'covering': any('Using index' in (row.get('Extra') or '') for row in rows),
+                        'ok': entry['index'] in used
+                    })
+            finally:
+                cursor.close()
+        return results
+
+    @staticmethod
+    def _ensure_version_table(cursor) -> None:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB
+        """)
+
+
+def main(argv=None) -> int:
+    """Apply pending migrations, then verify the index plan."""
+    import argparse
+    from .database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Apply YAMS database migrations.')
+    parser.add_argument('--target', type=int, help='Stop after this schema version')
+    parser.add_argument('--check', action='store_true',
+                        help='Only EXPLAIN the dashboard queries, do not migrate')
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager()
+    try:
+        if db.backend.name != 'mysql':
+            # The embedded backends create their full schema on first use
+            print(f"Migrations only apply to MySQL, not {db.backend.name}")
+            return 0
+        runner = MigrationRunner(lambda: db.backend.connection())
+        if not args.check:
+            runner.migrate(args.target)
+            print(f"Schema version: {runner.current_version()}")
+
+        failures = 0
+        for result in runner.check_index_plan():
+            status = 'ok' if result['ok'] else 'NOT USING INDEX'
+            print(f"{result['name']}: {status} (expected {result['expected_index']}, "
+                  f"used {', '.join(result['used_indexes']) or 'none'})")
+            failures += not result['ok']
+        return 1 if failures else 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
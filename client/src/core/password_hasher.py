@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, List, Optional
+import bcrypt
+from .metrics import metrics
+
+
+def _hash_password(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check_password(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification on a pool of worker processes.
+
+    bcrypt is deliberately slow, so keeping it in separate processes keeps it
+    off the GUI thread and lets bulk registration use every CPU core. The work
+    factor comes from ``BCRYPT_ROUNDS``; hashes made with a lower cost are
+    reported by ``needs_rehash`` so they can be upgraded on the next login.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PasswordHasher, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.rounds = int(os.getenv('BCRYPT_ROUNDS', '12'))
+        self.workers = int(os.getenv('BCRYPT_WORKERS', str(os.cpu_count() or 1)))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._initialized = True
+
+    def hash_password(self, password: str) -> str:
+        """Hash a password with the configured work factor."""
+        return self.hash_passwords([password])[0]
+
+    def hash_passwords(self, passwords: Iterable[str]) -> List[str]:
+        """Hash several passwords in parallel, preserving their order."""
+        encoded = [password.encode('utf-8') for password in passwords]
+        with metrics.timer('bcrypt.hash'):
+            hashes = self._run(_hash_password, encoded, [self.rounds] * len(encoded))
+        metrics.increment('bcrypt.hashes', len(encoded))
+        return [password_hash.decode('utf-8') for password_hash in hashes]
+
+    def verify_password(self, password: str, password_hash: str) -> bool:
+        """Check a password against a stored bcrypt hash."""
+        with metrics.timer('bcrypt.verify'):
+            return self._run(_check_password, [password.encode('utf-8')],
+                             [password_hash.encode('utf-8')])[0]
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Check whether a hash was made with a lower cost than configured."""
+        try:
+            # Modular crypt format: $2b$<cost>$<salt+hash>
+            return int(password_hash.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _run(self, fn, *iterables) -> list:
+        with self._lock:
+            if self._pool is None:
+                # Spawn, not fork: by the first login the app runs several threads
+                # whose locks a forked child could inherit in a held state
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            pool = self._pool
+        try:
+            return list(pool.map(fn, *iterables))
+        except BrokenProcessPool:
+            # A worker died (or processes are unavailable); start over next time
+            # and finish this call inline rather than failing the login.
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            return [fn(*args) for args in zip(*iterables)]
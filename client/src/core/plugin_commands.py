@@ -0,0 +1,112 @@
+import inspect
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class CommandCancelled(Exception):
+    """Raised inside a plugin command to stop it after a cancel request."""
+
+
+class CancellationToken:
+    """Lets the caller of an async command ask the plugin to stop.
+
+    Plugins that accept a ``cancel_token`` argument should check
+    ``is_cancelled()`` or call ``raise_if_cancelled()`` between steps.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Request cancellation."""
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """Raise CommandCancelled if cancellation was requested."""
+        if self._event.is_set():
+            raise CommandCancelled()
+
+
+def accepted_keywords(function: Callable) -> set:
+    """Names of the keyword parameters ``function`` declares explicitly."""
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        return set()
+    return {parameter.name for parameter in parameters
+            if parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)}
+
+
+class PluginCommandRunner(QObject):
+    """Runs plugin commands on a thread pool and reports them as signals.
+
+    Each call returns a Future. Plugins whose ``execute_command`` declares a
+    ``cancel_token`` or ``progress`` parameter receive them; others are
+    called exactly as before. Signals carry the command's Future and are
+    delivered on the thread that created the runner.
+    """
+
+    command_finished = pyqtSignal(object, object)   # future, result
+    command_failed = pyqtSignal(object, str)        # future, error
+    command_cancelled = pyqtSignal(object)          # future
+    command_progress = pyqtSignal(object, object)   # future, progress value
+
+    def __init__(self, max_workers: int = 4, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='yams-plugin-command')
+
+    def submit(self, resolve: Callable[[], Any], command: str, args: tuple, kwargs: dict,
+               cancel_token: Optional[CancellationToken] = None,
+               progress: Optional[Callable[[Any], None]] = None) -> Future:
+        """Run ``command`` on the plugin returned by ``resolve()`` in the pool.
+
+        ``future.cancel()`` only stops a command that has not started; pass
+        a ``cancel_token`` to be able to stop a running one.
+        """
+        cancel_token = cancel_token or CancellationToken()
+        # The worker may start before submit() returns the future
+        started = threading.Event()
+        holder = {}
+
+        def report_progress(value: Any) -> None:
+            if progress is not None:
+                progress(value)
+            self.command_progress.emit(holder['future'], value)
+
+        def run() -> Any:
+            started.wait()
+            cancel_token.raise_if_cancelled()
+            plugin = resolve()
+            if plugin is None:
+                return False
+            target = plugin.activate() if hasattr(plugin, 'activate') else plugin
+            accepted = accepted_keywords(target.execute_command)
+            if 'cancel_token' in accepted:
+                kwargs['cancel_token'] = cancel_token
+            if 'progress' in accepted:
+                kwargs['progress'] = report_progress
+            return plugin.execute_command(command, *args, **kwargs)
+
+        future = holder['future'] = self._executor.submit(run)
+        started.set()
+        future.add_done_callback(self._report)
+        return future
+
+    def _report(self, future: Future) -> None:
+        error = CommandCancelled() if future.cancelled() else future.exception()
+        if isinstance(error, CommandCancelled):
+            self.command_cancelled.emit(future)
+        elif error is not None:
+            self.command_failed.emit(future, str(error))
+        else:
+            self.command_finished.emit(future, future.result())
+
+    def shutdown(self) -> None:
+        """Drop queued commands; running ones finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,328 @@
+import os
+import pickle
+import struct
+import subprocess
+import sys
+import threading
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+# Every message is a 4-byte big-endian length followed by a pickled tuple
+FRAME_HEADER = struct.Struct('>I')
+
+PLUGIN_METHODS = ('initialize', 'cleanup', 'is_active', 'get_commands', 'execute_command', 'get_metadata')
+
+
+class PluginHostError(Exception):
+    """A plugin host request failed or the host process died."""
+
+
+def find_plugin_class(module: Any) -> Optional[Tuple[str, type]]:
+    """Return the name and class of the first plugin class in a module."""
+    for item_name in dir(module):
+        item = getattr(module, item_name)
+        if isinstance(item, type) and all(hasattr(item, method) for method in PLUGIN_METHODS):
+            return item_name, item
+    return None
+
+
+def encode_frame(message: Any) -> bytes:
+    """Serialize a message with its length prefix."""
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return FRAME_HEADER.pack(len(data)) + data
+
+
+def write_frame(stream: BinaryIO, message: Any) -> None:
+    """Write one length-prefixed message."""
+    stream.write(encode_frame(message))
+    stream.flush()
+
+
+def read_frame(stream: BinaryIO) -> Any:
+    """Read one length-prefixed message; raises EOFError if the stream closed."""
+    (length,) = FRAME_HEADER.unpack(_read_exact(stream, FRAME_HEADER.size))
+    return pickle.loads(_read_exact(stream, length))
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise EOFError('plugin host channel closed')
+        data += chunk
+    return data
+
+
+class PluginHost:
+    """A child process that runs plugins away from the GUI process.
+
+    Requests are handled one at a time over the child's stdin and stdout.
+    The child's address space is capped at ``memory_mb`` where the platform
+    supports it. If the child dies, the request in flight fails with
+    PluginHostError and the next request starts a new child, which loads
+    and initializes the plugins the old one had.
+    """
+
+    def __init__(self, memory_mb: int = 1024):
+        self.memory_mb = memory_mb
+        self.restarts = 0
+        self._started = False
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        # plugin path -> {'active': ..., 'initialized': ...}, replayed after a restart
+        self._plugins: Dict[str, Dict[str, Any]] = {}
+
+    def load(self, plugin_path: str) -> Optional[Tuple[str, Dict[str, Any], Any]]:
+        """Import a plugin file in the host; return its name, metadata and commands."""
+        loaded = self._request('load', plugin_path)
+        if loaded is not None:
+            self._plugins[plugin_path] = {'active': None, 'initialized': False}
+        return loaded
+
+    def call(self, plugin_path: str, method: str, *args, **kwargs) -> Any:
+        """Call a plugin method in the host and return its result."""
+        result = self._request('call', plugin_path, method, args, kwargs)
+        if method == 'initialize' and plugin_path in self._plugins:
+            self._plugins[plugin_path]['initialized'] = True
+        return result
+
+    def set_active(self, plugin_path: str, active: bool) -> None:
+        """Set a hosted plugin's ``_active`` flag."""
+        self._request('set_active', plugin_path, active)
+        if plugin_path in self._plugins:
+            self._plugins[plugin_path]['active'] = active
+
+    def unload(self, plugin_path: str) -> None:
+        """Drop a plugin and its modules; stops the host once it runs no plugins."""
+        if self._plugins.pop(plugin_path, None) is None:
+            return
+        if self._plugins:
+            self._request('unload', plugin_path)
+        else:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the host process."""
+        with self._lock:
+            self._stop()
+
+    def _request(self, op: str, *args) -> Any:
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            response = self._send(op, args)
+        if response[0] == 'error':
+            raise PluginHostError(f"{response[1]}: {response[2]}")
+        return response[1]
+
+    def _send(self, op: str, args: tuple) -> tuple:
+        if self._process is None:
+            # Restoring the plugins of a restarted host killed it again
+            raise PluginHostError("Plugin host exited while restoring its plugins")
+        try:
+            write_frame(self._process.stdin, (op, args))
+            return read_frame(self._process.stdout)
+        except (OSError, EOFError) as e:
+            code = self._process.poll()
+            self._stop()
+            raise PluginHostError(f"Plugin host exited (code {code}): {e}") from e
+
+    def _start(self) -> None:
+        self._stop()
+        if self._started:
+            self.restarts += 1
+            print(f"Restarting plugin host (restart {self.restarts})")
+        self._started = True
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(self.memory_mb)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        # Bring back what the previous process was running
+        for plugin_path, state in list(self._plugins.items()):
+            try:
+                self._replay(plugin_path, state)
+            except PluginHostError as e:
+                print(f"Error restoring plugin {plugin_path} in plugin host: {e}")
+                self._plugins.pop(plugin_path, None)
+                if self._process is None:
+                    return
+
+    def _replay(self, plugin_path: str, state: Dict[str, Any]) -> None:
+        requests: List[tuple] = [('load', (plugin_path,))]
+        if state['active'] is not None:
+            requests.append(('set_active', (plugin_path, state['active'])))
+        if state['initialized']:
+            requests.append(('call', (plugin_path, 'initialize', (), {})))
+        for op, args in requests:
+            response = self._send(op, args)
+            if response[0] == 'error':
+                raise PluginHostError(f"{response[1]}: {response[2]}")
+
+    def _stop(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+class PluginHostPool:
+    """Assigns plugin files to hosts: one shared host, or one host per plugin."""
+
+    def __init__(self, per_plugin: bool = False, memory_mb: int = 1024):
+        self.per_plugin = per_plugin
+        self.memory_mb = memory_mb
+        self._hosts: Dict[str, PluginHost] = {}
+        self._lock = threading.Lock()
+
+    def host_for(self, plugin_path: str) -> PluginHost:
+        """Return the host that runs ``plugin_path``."""
+        key = plugin_path if self.per_plugin else ''
+        with self._lock:
+            host = self._hosts.get(key)
+            if host is None:
+                host = self._hosts[key] = PluginHost(self.memory_mb)
+            return host
+
+    def close(self) -> None:
+        """Stop all host processes."""
+        with self._lock:
+            hosts, self._hosts = list(self._hosts.values()), {}
+        for host in hosts:
+            host.close()
+
+
+class RemotePlugin:
+    """Stand-in for a plugin running in a PluginHost.
+
+    Metadata and commands are copied when the plugin is loaded, so listing
+    plugins makes no host requests; ``execute_command`` and the lifecycle
+    methods are forwarded.
+    """
+
+    def __init__(self, host: PluginHost, plugin_path: str, metadata: Dict[str, Any], commands: Any):
+        self.host = host
+        self.plugin_path = plugin_path
+        self.metadata = metadata
+        self.commands = commands
+        self._active_state = False
+
+    @property
+    def _active(self) -> bool:
+        return self._active_state
+
+    @_active.setter
+    def _active(self, active: bool) -> None:
+        self._active_state = active
+        self.host.set_active(self.plugin_path, active)
+
+    def initialize(self) -> bool:
+        return self.host.call(self.plugin_path, 'initialize')
+
+    def cleanup(self) -> None:
+        try:
+            self.host.call(self.plugin_path, 'cleanup')
+        finally:
+            self.host.unload(self.plugin_path)
+
+    def is_active(self) -> bool:
+        return self._active_state
+
+    def get_commands(self) -> Any:
+        return self.commands
+
+    def execute_command(self, command: str, *args, **kwargs) -> Any:
+        return self.host.call(self.plugin_path, 'execute_command', command, *args, **kwargs)
+
+    def get_metadata(self) -> Dict[str, Any]:
+        return dict(self.metadata)
+
+
+def serve(memory_mb: int) -> None:
+    """Run the host side: answer requests on stdin until it closes."""
+    import importlib.util
+
+    # Frames use the original stdout; anything plugins print goes to stderr
+    channel_out = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    channel_in = sys.stdin.buffer
+
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Plugin host memory cap not applied: {e}")
+
+    plugins: Dict[str, Any] = {}
+    modules: Dict[str, List[str]] = {}
+
+    def load(plugin_path: str):
+        directory = os.path.dirname(plugin_path)
+        if directory not in sys.path:
+            sys.path.append(directory)
+        module_name = os.path.splitext(os.path.basename(plugin_path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, plugin_path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Failed to load spec for {plugin_path}")
+        module = importlib.util.module_from_spec(spec)
+        before = set(sys.modules)
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            # Only modules from the plugin's directory; other plugins in a
+            # shared host may use the stdlib and packages it imported first
+            prefix = os.path.join(os.path.abspath(directory), '')
+            modules[plugin_path] = []
+            for name in sys.modules.keys() - before:
+                path = getattr(sys.modules.get(name), '__file__', None)
+                if path and os.path.abspath(path).startswith(prefix):
+                    modules[plugin_path].append(name)
+        found = find_plugin_class(module)
+        if found is None:
+            return None
+        plugin = plugins[plugin_path] = found[1]()
+        metadata = plugin.get_metadata()
+        return metadata.get('name', found[0]), metadata, plugin.get_commands()
+
+    def unload(plugin_path: str):
+        plugins.pop(plugin_path, None)
+        for name in modules.pop(plugin_path, []):
+            sys.modules.pop(name, None)
+
+    def set_active(plugin_path: str, active: bool):
+        plugin = plugins[plugin_path]
+        if hasattr(plugin, '_active'):
+            plugin._active = active
+
+    def call(plugin_path: str, method: str, args: tuple, kwargs: dict):
+        if method not in PLUGIN_METHODS:
+            raise AttributeError(f"{method} is not a plugin method")
+        return getattr(plugins[plugin_path], method)(*args, **kwargs)
+
+    handlers = {'load': load, 'unload': unload, 'set_active': set_active, 'call': call}
+    while True:
+        try:
+            op, args = read_frame(channel_in)
+        except EOFError:
+            return
+        try:
+            frame = encode_frame(('ok', handlers[op](*args)))
+        except Exception as e:
+            # Includes results that cannot be pickled
+            frame = encode_frame(('error', type(e).__name__, str(e)))
+        channel_out.write(frame)
+        channel_out.flush()
+
+
+if __name__ == '__main__':
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+INDEX_VERSION = 1
+
+
+class PluginIndex:
+    """On-disk cache of plugin metadata, commands and validation results.
+
+    Entries are keyed by plugin file path and carry the file's content hash
+    (plus mtime and size for a stat-only check on cold start), so an entry
+    for a changed file is never used. The index is written atomically and
+    only when it changed.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(os.path.expanduser('~'), '.yams', 'plugin_index.json')
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def get(self, plugin_path: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for a plugin file, if any."""
+        with self._lock:
+            return self._entries.get(plugin_path)
+
+    def put(self, plugin_path: str, entry: Dict[str, Any]) -> None:
+        """Store the entry for a plugin file."""
+        with self._lock:
+            if self._entries.get(plugin_path) != entry:
+                self._entries[plugin_path] = entry
+                self._dirty = True
+
+    def remove(self, plugin_path: str) -> None:
+        """Forget a plugin file."""
+        with self._lock:
+            if self._entries.pop(plugin_path, None) is not None:
+                self._dirty = True
+
+    def record(self, hit: bool) -> None:
+        """Count one lookup as a hit or a miss."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def save(self) -> None:
+        """Write the index if it changed since it was last loaded or saved."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {'version': INDEX_VERSION, 'entries': self._entries}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = f'{self.path}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, default=str)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error saving plugin index {self.path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the entry count and lookup hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable plugin index {self.path}: {e}")
+            return
+        if isinstance(data, dict) and data.get('version') == INDEX_VERSION:
+            self._entries = data.get('entries', {})
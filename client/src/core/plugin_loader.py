@@ -1,9 +1,233 @@
 import os
 import sys
+import ast
+import queue
+import hashlib
 import importlib.util
 import shutil
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
 from PyQt6.QtCore import QSettings
+from .command_index import CommandEntry, CommandIndex
+from .metrics import metrics
+from .plugin_commands import CancellationToken, PluginCommandRunner
+from .plugin_host import PluginHostPool, RemotePlugin, find_plugin_class
+from .plugin_index import PluginIndex
+from .plugin_state import PluginStateStore
+from .plugin_watcher import PluginWatcher
+
+# What was last loaded from a plugin file; plugin_name is None for files
+# without a plugin class (e.g. helper modules)
+PluginFile = namedtuple('PluginFile', ['mtime_ns', 'size', 'digest', 'plugin_name'])
+
+# Work handed to the load pool: import a file (plugin is None) or activate a LazyPlugin
+PluginJob = namedtuple('PluginJob', ['path', 'mtime_ns', 'size', 'digest', 'plugin'])
+
+# Module-level constant a plugin can declare so it is only imported on use:
+#   PLUGIN_MANIFEST = {'name': 'Backup', 'version': '1.2.0', 'commands': {'run': 'Run a backup'}}
+MANIFEST_NAME = 'PLUGIN_MANIFEST'
+
+
+def read_manifest(source: bytes, filename: str = '<plugin>') -> Optional[Dict[str, Any]]:
+    """Return a plugin file's ``PLUGIN_MANIFEST`` without executing the module."""
+    if MANIFEST_NAME.encode() not in source:
+        return None
+    for node in ast.parse(source, filename).body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+        if any(isinstance(target, ast.Name) and target.id == MANIFEST_NAME for target in targets):
+            manifest = ast.literal_eval(node.value)
+            if not isinstance(manifest, dict) or not isinstance(manifest.get('name'), str):
+                raise ValueError(f"{MANIFEST_NAME} must be a dict literal with a 'name'")
+            return manifest
+    return None
+
+
+class LazyPlugin:
+    """Stand-in for a plugin that is imported on first use.
+
+    Name, version and commands come from the plugin's manifest, or from the
+    plugin index for a file that was loaded before. The module is imported
+    and ``initialize()`` called when the plugin is activated or runs its
+    first command. Switching it on hands ``activate`` to ``schedule`` if
+    given, so a slow import does not block the caller.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], load: Callable[[], Any], commands: Any = None,
+                 schedule: Optional[Callable[['LazyPlugin'], None]] = None):
+        self.manifest = manifest
+        self.commands = manifest.get('commands', {}) if commands is None else commands
+        self.instance = None
+        self._load = load
+        self._schedule = schedule
+        self._active_state = False
+        self._activate_lock = threading.Lock()
+
+    @property
+    def _active(self) -> bool:
+        return self._active_state
+
+    @_active.setter
+    def _active(self, active: bool) -> None:
+        self._active_state = active
+        if self.instance is not None:
+            if hasattr(self.instance, '_active'):
+                self.instance._active = active
+        elif active and self._schedule is not None:
+            self._schedule(self)
+        elif active:
+            try:
+                self.activate()
+            except Exception as e:
+                print(f"Error activating plugin {self.manifest['name']}: {e}")
+
+    def set_active_state(self, active: bool) -> None:
+        """Set the active flag without importing the plugin."""
+        self._active_state = active
+
+    def activate(self) -> Any:
+        """Import, create and initialize the real plugin if that has not happened yet."""
+        with self._activate_lock:
+            if self.instance is None:
+                start = time.perf_counter()
+                instance = self._load()
+                if hasattr(instance, '_active'):
+                    instance._active = self._active_state
+                instance.initialize()
+                self.instance = instance
+                metrics.record('plugins.activate', time.perf_counter() - start)
+        return self.instance
+
+    def initialize(self) -> bool:
+        self.activate()
+        return True
+
+    def cleanup(self) -> None:
+        if self.instance is not None:
+            self.instance.cleanup()
+            self.instance = None
+
+    def is_active(self) -> bool:
+        return self._active_state
+
+    def get_commands(self) -> Any:
+        return self.commands
+
+    def execute_command(self, command: str, *args, **kwargs) -> Any:
+        return self.activate().execute_command(command, *args, **kwargs)
+
+    def get_metadata(self) -> Dict[str, Any]:
+        return dict(self.manifest)
+
+
+class ImportTracker:
+    """``sys.meta_path`` hook that reports each module found by the other
+    finders to the ModuleRegistry tracking on the importing thread.
+
+    It is installed once and stays installed: inserting into or removing
+    from ``sys.meta_path`` while another thread imports can make that import
+    skip a finder.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._installed = False
+
+    @contextmanager
+    def track(self, registry: 'ModuleRegistry', owner: str, directory: str):
+        with self._lock:
+            if not self._installed:
+                sys.meta_path.insert(0, self)
+                self._installed = True
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        self._local.stack.append((registry, owner, os.path.join(os.path.abspath(directory), '')))
+        try:
+            yield
+        finally:
+            self._local.stack.pop()
+
+    def find_spec(self, name: str, path=None, target=None):
+        stack = getattr(self._local, 'stack', None)
+        if not stack or getattr(self._local, 'resolving', False):
+            return None
+        self._local.resolving = True
+        try:
+            for finder in list(sys.meta_path):
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.resolving = False
+        registry, owner, prefix = stack[-1]
+        if spec.origin and os.path.abspath(spec.origin).startswith(prefix):
+            registry.add(owner, name)
+        return spec
+
+
+import_tracker = ImportTracker()
+
+
+class ModuleRegistry:
+    """Names of the ``sys.modules`` entries that plugin files brought in.
+
+    Each module has one owner: the plugin file whose loading first imported
+    it from that plugin's directory. Purging an owner removes only its own
+    entries, so the cost grows with the plugin, not with the number of
+    modules the interpreter has loaded. Imports are attributed per thread,
+    so plugins can be imported concurrently.
+    """
+
+    def __init__(self):
+        self._owned: Dict[str, Set[str]] = {}
+        self._owners: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def track(self, owner: str, directory: str):
+        """Record modules this thread imports from ``directory`` during the ``with`` block."""
+        return import_tracker.track(self, owner, directory)
+
+    def add(self, owner: str, name: str) -> None:
+        """Record that ``owner`` created the module ``name``."""
+        with self._lock:
+            if name not in self._owners:
+                self._owners[name] = owner
+                self._owned.setdefault(owner, set()).add(name)
+
+    def owned(self, owner: str) -> Set[str]:
+        """Return the module names recorded for ``owner``."""
+        with self._lock:
+            return set(self._owned.get(owner, ()))
+
+    def owner_of(self, name: str) -> Optional[str]:
+        """Return the plugin file that created module ``name``, if any."""
+        return self._owners.get(name)
+
+    def purge(self, owner: str) -> List[str]:
+        """Remove the modules of ``owner`` from ``sys.modules`` and return their names."""
+        with self._lock:
+            names = self._owned.pop(owner, set())
+            for name in names:
+                del self._owners[name]
+        for name in names:
+            sys.modules.pop(name, None)
+        return sorted(names)
+
+    def __len__(self) -> int:
+        return len(self._owners)
 
 class PluginLoader:
     """Handles loading and managing plugins."""
@@ -12,6 +236,38 @@ class PluginLoader:
         self.plugins: Dict[str, Any] = {}
         self.plugin_directories = set()
         self.settings = QSettings('Codeium', 'YAMS')
+        # Active flags, read once and saved in batches
+        self.state = PluginStateStore(self.settings,
+                                      int(os.getenv('PLUGIN_STATE_FLUSH_MS', '500')) / 1000)
+        # plugin file path -> state of the file when it was last loaded
+        self.plugin_files: Dict[str, PluginFile] = {}
+        # Modules each plugin file added to sys.modules
+        self.modules = ModuleRegistry()
+        self.last_reload: Dict[str, Any] = {}
+        # Metadata of previously loaded files, so they need not be imported to be listed
+        self.index = PluginIndex(os.getenv('PLUGIN_INDEX_PATH'))
+        # Qualified command name -> plugin and command, kept in step with self.plugins
+        self.command_index = CommandIndex()
+        # Serializes reloads; self.plugins is replaced, never mutated, so
+        # other threads can iterate it while a reload runs.
+        self._lock = threading.RLock()
+        self.load_timeout = float(os.getenv('PLUGIN_LOAD_TIMEOUT', '10'))
+        self._pool = ThreadPoolExecutor(max_workers=int(os.getenv('PLUGIN_LOAD_WORKERS', '4')),
+                                        thread_name_prefix='yams-plugin-load')
+        self._listeners: List[Callable[[str], None]] = []
+        # (job, future) of loads that finished after their deadline. Pool
+        # threads only put here; the next reload publishes them under _lock.
+        self._late_jobs: queue.SimpleQueue = queue.SimpleQueue()
+        # Runs execute_command_async calls; connect to its signals for results
+        self.command_runner = PluginCommandRunner(int(os.getenv('PLUGIN_COMMAND_WORKERS', '4')))
+        # PLUGIN_ISOLATION: "off" (in this process), "shared" (one host process
+        # for all plugins) or "process" (one host process per plugin)
+        isolation = os.getenv('PLUGIN_ISOLATION', 'off')
+        self.hosts = None
+        if isolation in ('shared', 'process'):
+            self.hosts = PluginHostPool(isolation == 'process',
+                                        int(os.getenv('PLUGIN_HOST_MEMORY_MB', '1024')))
+        self.watcher = None
         
     def add_plugin_directory(self, directory: str) -> None:
         """Add a directory to search for plugins."""
@@ -20,83 +276,444 @@ class PluginLoader:
             # Add to Python path if not already there
             if directory not in sys.path:
                 sys.path.append(directory)
+            if self.watcher:
+                self.watcher.sync_paths()
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(plugin_name)`` whenever a plugin finishes loading, from any thread."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str], None]) -> None:
+        """Stop notifying ``listener``."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def shutdown(self) -> None:
+        """Stop background plugin work and host processes and save plugin states."""
+        if self.watcher:
+            self.watcher.stop()
+        self.state.flush()
+        self._pool.shutdown(wait=False)
+        self.command_runner.shutdown()
+        if self.hosts:
+            self.hosts.close()
+
+    def enable_hot_reload(self, debounce_ms: Optional[int] = None):
+        """Watch the plugin directories and reload changed plugins in the background."""
+        if self.watcher is None:
+            if debounce_ms is None:
+                debounce_ms = int(os.getenv('PLUGIN_RELOAD_DEBOUNCE_MS', '300'))
+            self.watcher = PluginWatcher(self, debounce_ms)
+        return self.watcher
     
-    def load_plugins(self) -> None:
-        """Load all plugins from registered directories."""
-        # Clear existing plugins
-        for plugin in self.plugins.values():
-            if hasattr(plugin, 'cleanup'):
+    def reload_in_background(self) -> None:
+        """Reload through the hot-reload watcher if it is enabled, otherwise right away.
+
+        GUI code should use this: ``load_plugins`` blocks for up to
+        ``load_timeout`` seconds while plugins import.
+        """
+        if self.watcher:
+            self.watcher.reload_now()
+        else:
+            self.load_plugins()
+
+    def load_plugins(self, force: bool = False) -> Dict[str, Any]:
+        """Load new and changed plugins from registered directories.
+
+        Only files that were added, removed, or whose content hash changed
+        since the last call are (re)loaded; other plugins keep running with
+        their state. A file whose mtime changed but whose content did not is
+        left alone. Files found in the plugin index with the same content are
+        registered from it as a LazyPlugin, so only active plugins are
+        imported. ``force`` reloads every plugin and bypasses the index.
+
+        Imports and ``initialize()`` calls run concurrently in a bounded pool;
+        each plugin is published as soon as it is ready. A plugin still
+        loading ``load_timeout`` seconds after it was queued is reported as
+        slow and published by the first reload after it finishes, which the
+        hot-reload watcher starts right away. Returns a report with the
+        added, changed, removed, slow and failed plugin files and the load
+        time of each reloaded plugin, also kept in ``last_reload``. Safe to call from a
+        worker thread.
+        """
+        with self._lock:
+            report = self._reload(force)
+            self.last_reload = report
+            return report
+
+    def _reload(self, force: bool) -> Dict[str, Any]:
+        """Apply file changes to the plugins and return the reload report."""
+        start = time.perf_counter()
+        report: Dict[str, Any] = {'added': [], 'changed': [], 'removed': [], 'unchanged': 0,
+                                  'timings': {}, 'slow': [], 'failed': {}}
+        self._finish_late_load_jobs(report)
+        plugins = dict(self.plugins)
+        jobs: List[PluginJob] = []
+
+        current = self._scan_plugin_files()
+        for plugin_path in [path for path in self.plugin_files if path not in current]:
+            self._unload_plugin_file(plugin_path, plugins)
+            self.index.remove(plugin_path)
+            report['removed'].append(plugin_path)
+
+        for plugin_path, (mtime_ns, size) in current.items():
+            self._reload_file(plugin_path, mtime_ns, size, force, plugins, report, jobs)
+
+        # A plugin that imported an edited or removed helper module must be
+        # reloaded too, or it keeps running the old helper code
+        reloaded = set(report['added']) | set(report['changed'])
+        for plugin_path in self._dependents(report['changed'] + report['removed']):
+            if plugin_path in current and plugin_path not in reloaded:
+                self._reload_file(plugin_path, *current[plugin_path], True, plugins, report, jobs)
+
+        # Registered and removed plugins are visible while the rest load
+        self.plugins = plugins
+        self._run_load_jobs(jobs, report)
+
+        self.index.save()
+        report['index'] = self.index.stats()
+        report['seconds'] = time.perf_counter() - start
+        metrics.record('plugins.reload', report['seconds'])
+        if report['added'] or report['changed'] or report['removed']:
+            print(f"Plugins reloaded in {report['seconds'] * 1000:.1f} ms: "
+                  f"{len(report['added'])} added, {len(report['changed'])} changed, "
+                  f"{len(report['removed'])} removed, {report['unchanged']} unchanged, "
+                  f"index hit rate {report['index']['hit_rate']:.0%}")
+        return report
+
+    def _reload_file(self, plugin_path: str, mtime_ns: int, size: int, force: bool,
+                     plugins: Dict[str, Any], report: Dict[str, Any], jobs: List[PluginJob]) -> None:
+        """Register, or queue the import of, one new or changed plugin file."""
+        known = self.plugin_files.get(plugin_path)
+        if known and not force and (known.mtime_ns, known.size) == (mtime_ns, size):
+            report['unchanged'] += 1
+            return
+
+        entry = None if force else self.index.get(plugin_path)
+        if entry and not known and (entry['mtime_ns'], entry['size']) == (mtime_ns, size):
+            # First load in this process of a file the index has seen unchanged
+            source, digest = None, entry['digest']
+        else:
+            try:
+                with open(plugin_path, 'rb') as f:
+                    source = f.read()
+            except OSError as e:
+                print(f"Error reading plugin {plugin_path}: {e}")
+                return
+            digest = hashlib.sha256(source).hexdigest()
+            if known and not force and known.digest == digest:
+                # Touched but not modified
+                self.plugin_files[plugin_path] = known._replace(mtime_ns=mtime_ns, size=size)
+                report['unchanged'] += 1
+                return
+            if entry and entry['digest'] != digest:
+                entry = None
+        if not force:
+            self.index.record(entry is not None)
+
+        if known:
+            self._unload_plugin_file(plugin_path, plugins)
+        report['changed' if known else 'added'].append(plugin_path)
+        load_start = time.perf_counter()
+        if entry:
+            plugin_name = self._load_plugin_from_index(plugin_path, plugins, entry)
+        else:
+            plugin_name = self._load_plugin_from_manifest(plugin_path, plugins, source)
+            if plugin_name:
+                self._index_plugin_file(plugin_path, plugin_name, plugins[plugin_name], None,
+                                        mtime_ns, size, digest)
+        self.plugin_files[plugin_path] = PluginFile(mtime_ns, size, digest, plugin_name)
+
+        if plugin_name:
+            # Set active state from settings; active lazy plugins are imported in the pool
+            plugin = plugins[plugin_name]
+            active = self.state.is_active(plugin_name)
+            plugin.set_active_state(active)
+            self.command_index.add(plugin_name, plugin, plugin.get_commands(), active)
+            if active:
+                jobs.append(PluginJob(plugin_path, mtime_ns, size, digest, plugin))
+            else:
+                elapsed = time.perf_counter() - load_start
+                report['timings'][plugin_name] = elapsed
+                metrics.record('plugins.load', elapsed)
+        elif not entry:
+            jobs.append(PluginJob(plugin_path, mtime_ns, size, digest, None))
+
+    def _dependents(self, plugin_paths: List[str]) -> Set[str]:
+        """Plugin files that own the module loaded from one of ``plugin_paths``."""
+        owners = set()
+        for plugin_path in plugin_paths:
+            name = os.path.splitext(os.path.basename(plugin_path))[0]
+            owner = self.modules.owner_of(name)
+            module_path = getattr(sys.modules.get(name), '__file__', None)
+            if (owner and owner != plugin_path and module_path
+                    and os.path.abspath(module_path) == os.path.abspath(plugin_path)):
+                owners.add(owner)
+        return owners
+
+    def _scan_plugin_files(self) -> Dict[str, tuple]:
+        """Find plugin files in all directories with their mtime and size."""
+        files = {}
+        for directory in list(self.plugin_directories):
+            try:
+                # Look for Python files that might be plugins
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.py') and not entry.name.startswith('__') and entry.is_file():
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError as e:
+                print(f"Error loading plugins from {directory}: {e}")
+        return files
+
+    def _unload_plugin_file(self, plugin_path: str, plugins: Dict[str, Any]) -> None:
+        """Clean up and forget the plugin loaded from a file."""
+        known = self.plugin_files.pop(plugin_path, None)
+        if known is None:
+            return
+        plugin = plugins.pop(known.plugin_name, None) if known.plugin_name else None
+        if known.plugin_name:
+            self.command_index.remove(known.plugin_name)
+        if plugin is not None and hasattr(plugin, 'cleanup'):
+            try:
                 plugin.cleanup()
-        self.plugins.clear()
-        
-        # Clear module cache for plugins
-        for module_name in list(sys.modules.keys()):
-            if any(directory in str(sys.modules[module_name]) for directory in self.plugin_directories):
-                del sys.modules[module_name]
-        
-        # Reload all plugins
-        for directory in self.plugin_directories:
-            self._load_plugins_from_directory(directory)
-            
-        # Set active states from settings
-        for plugin_name, plugin in self.plugins.items():
-            active = self.settings.value(f'plugins/{plugin_name}/active', True, type=bool)
-            if hasattr(plugin, '_active'):
-                plugin._active = active
-    
-    def _load_plugins_from_directory(self, directory: str) -> None:
-        """Load plugins from a specific directory."""
+            except Exception as e:
+                print(f"Error cleaning up plugin {known.plugin_name}: {e}")
+
+        # Drop its modules so the next load imports the current code
+        self.modules.purge(plugin_path)
+
+    def _load_plugin_from_index(self, plugin_path: str, plugins: Dict[str, Any],
+                                entry: Dict[str, Any]) -> Optional[str]:
+        """Register a plugin from its index entry without importing it."""
+        if not entry['valid']:
+            return None
+        plugin_name = entry['name']
+        manifest = dict(entry['metadata'])
+        manifest.setdefault('name', plugin_name)
+        plugins[plugin_name] = LazyPlugin(manifest, lambda: self._import_plugin(plugin_path),
+                                          entry['commands'], self._activate_in_background)
+        print(f"Registered plugin: {plugin_name}")
+        return plugin_name
+
+    def _index_plugin_file(self, plugin_path: str, plugin_name: Optional[str], plugin: Any,
+                           error: Optional[str],
+                           mtime_ns: int, size: int, digest: str) -> None:
+        """Record what loading a plugin file found in the plugin index."""
+        if error is not None:
+            # Failures may be transient (e.g. a missing dependency); retry next time
+            self.index.remove(plugin_path)
+            return
+        entry = {'mtime_ns': mtime_ns, 'size': size, 'digest': digest, 'name': plugin_name,
+                 'valid': plugin_name is not None, 'metadata': {}, 'commands': {}}
+        if plugin_name:
+            try:
+                entry['metadata'] = plugin.get_metadata()
+                entry['commands'] = plugin.get_commands()
+            except Exception as e:
+                print(f"Error indexing plugin {plugin_name}: {e}")
+                self.index.remove(plugin_path)
+                return
+        self.index.put(plugin_path, entry)
+
+    def _load_plugin_from_manifest(self, plugin_path: str, plugins: Dict[str, Any],
+                                   source: bytes) -> Optional[str]:
+        """Register a plugin that declares a manifest as a LazyPlugin, without running its code."""
         try:
-            # Look for Python files that might be plugins
-            for filename in os.listdir(directory):
-                if filename.endswith('.py') and not filename.startswith('__'):
-                    plugin_path = os.path.join(directory, filename)
-                    self._load_plugin_from_file(plugin_path)
-        except Exception as e:
-            print(f"Error loading plugins from {directory}: {e}")
-    
-    def _load_plugin_from_file(self, plugin_path: str) -> None:
-        """Load a plugin from a specific file."""
+            manifest = read_manifest(source, plugin_path)
+        except (SyntaxError, ValueError) as e:
+            print(f"Ignoring invalid manifest in {plugin_path}: {e}")
+            return None
+        if manifest is None:
+            return None
+        plugin_name = manifest['name']
+        plugins[plugin_name] = LazyPlugin(manifest, lambda: self._import_plugin(plugin_path),
+                                          schedule=self._activate_in_background)
+        print(f"Registered plugin: {plugin_name}")
+        return plugin_name
+
+    def _run_load_jobs(self, jobs: List[PluginJob], report: Dict[str, Any]) -> None:
+        """Run plugin imports and activations in the pool until each finishes or times out."""
+        # Deadlines count from submission: a job stuck behind busy workers
+        # must not keep the reload (and self._lock) waiting
+        deadline = time.perf_counter() + self.load_timeout
+        futures = {self._pool.submit(self._run_load_job, job): job for job in jobs}
+        pending = set(futures)
+        while pending:
+            timeout = max(0.0, deadline - time.perf_counter())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                self._finish_load_job(futures[future], future, report)
+            if pending and time.perf_counter() >= deadline:
+                break
+
+        for future in pending:
+            job = futures[future]
+            print(f"Plugin {job.path} is still loading after {self.load_timeout:.0f}s; "
+                  "it will be added when it finishes")
+            report['slow'].append(job.path)
+            metrics.increment('plugins.slow')
+            future.add_done_callback(lambda f, job=job: self._queue_late_load_job(job, f))
+
+    def _run_load_job(self, job: PluginJob) -> Tuple[Any, float]:
+        """Import and initialize one plugin; runs in the load pool."""
+        start = time.perf_counter()
+        if job.plugin is not None:
+            job.plugin.activate()
+            return job.plugin, time.perf_counter() - start
+        created = self._create_plugin(job.path)
+        if created is not None:
+            created[1].initialize()
+        return created, time.perf_counter() - start
+
+    def _finish_load_job(self, job: PluginJob, future: Future, report: Dict[str, Any]) -> None:
+        """Publish a plugin whose load job finished; the caller holds ``self._lock``."""
         try:
-            # Get module name from filename
-            module_name = os.path.splitext(os.path.basename(plugin_path))[0]
-            
-            # Load module
-            spec = importlib.util.spec_from_file_location(module_name, plugin_path)
-            if spec is None or spec.loader is None:
-                print(f"Failed to load spec for {plugin_path}")
+            created, elapsed = future.result()
+        except Exception as e:
+            print(f"Error loading plugin {job.path}: {e}")
+            report['failed'][job.path] = str(e)
+            metrics.increment('plugins.failed')
+            if job.plugin is None:
+                self._index_plugin_file(job.path, None, None, str(e),
+                                        job.mtime_ns, job.size, job.digest)
+            return
+
+        known = self.plugin_files.get(job.path)
+        if known is None or known.digest != job.digest:
+            # Unloaded or changed while it was loading
+            if job.plugin is None and created is not None:
+                created[1].cleanup()
+            return
+
+        if job.plugin is not None:
+            plugin_name = known.plugin_name
+        else:
+            plugin_name, plugin = created if created is not None else (None, None)
+            self._index_plugin_file(job.path, plugin_name, plugin, None,
+                                    job.mtime_ns, job.size, job.digest)
+            if plugin is None:
                 return
-                
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Look for plugin class
-            for item_name in dir(module):
-                item = getattr(module, item_name)
-                if (isinstance(item, type) and 
-                    hasattr(item, 'initialize') and 
-                    hasattr(item, 'cleanup') and
-                    hasattr(item, 'is_active') and
-                    hasattr(item, 'get_commands') and
-                    hasattr(item, 'execute_command') and
-                    hasattr(item, 'get_metadata')):
-                    
-                    # Create plugin instance
-                    plugin = item()
-                    metadata = plugin.get_metadata()
-                    plugin_name = metadata.get('name', item_name)
-                    
-                    # Store plugin
-                    self.plugins[plugin_name] = plugin
-                    print(f"Loaded plugin: {plugin_name}")
-                    break
+            active = self.state.is_active(plugin_name)
+            if hasattr(plugin, '_active'):
+                plugin._active = active
+            plugins = dict(self.plugins)
+            plugins[plugin_name] = plugin
+            self.plugins = plugins
+            self.plugin_files[job.path] = known._replace(plugin_name=plugin_name)
+            self.command_index.add(plugin_name, plugin, self.get_plugin_info(plugin_name)['commands'],
+                                   plugin.is_active())
+            print(f"Loaded plugin: {plugin_name}")
+
+        report['timings'][plugin_name] = elapsed
+        metrics.record('plugins.load', elapsed)
+        self._notify_listeners(plugin_name)
+
+    def _notify_listeners(self, plugin_name: str) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(plugin_name)
+            except Exception as e:
+                print(f"Plugin listener error: {e}")
+
+    def _activate_in_background(self, plugin: LazyPlugin) -> None:
+        """Import a lazy plugin that was switched on in the load pool, then notify listeners."""
+        future = self._pool.submit(plugin.activate)
+        future.add_done_callback(lambda f: self._finish_activation(plugin, f))
+
+    def _finish_activation(self, plugin: LazyPlugin, future: Future) -> None:
+        plugin_name = plugin.manifest['name']
+        error = CancelledError() if future.cancelled() else future.exception()
+        if error is not None:
+            print(f"Error activating plugin {plugin_name}: {error}")
+            metrics.increment('plugins.failed')
+            return
+        self._notify_listeners(plugin_name)
+
+    def _queue_late_load_job(self, job: PluginJob, future: Future) -> None:
+        """Hand a load that finished after its deadline to the next reload.
+
+        Runs on a pool thread, so it must not take ``self._lock``: a reload
+        holding it may be waiting for this very thread.
+        """
+        self._late_jobs.put((job, future))
+        if self.watcher:
+            self.watcher.request_reload()
+
+    def _finish_late_load_jobs(self, report: Dict[str, Any]) -> None:
+        """Publish the queued late loads; the caller holds ``self._lock``."""
+        while True:
+            try:
+                job, future = self._late_jobs.get_nowait()
+            except queue.Empty:
+                return
+            self._finish_load_job(job, future, report)
+
+    def _import_plugin(self, plugin_path: str) -> Any:
+        """Create the plugin instance behind a LazyPlugin."""
+        created = self._create_plugin(plugin_path)
+        if created is None:
+            raise ValueError(f"No plugin class found in {plugin_path}")
+        return created[1]
+
+    def _create_plugin(self, plugin_path: str) -> Optional[Tuple[str, Any]]:
+        """Import a plugin file and instantiate its plugin class."""
+        if self.hosts:
+            return self._create_remote_plugin(plugin_path)
+
+        # Get module name from filename
+        module_name = os.path.splitext(os.path.basename(plugin_path))[0]
+        
+        # Load module
+        spec = importlib.util.spec_from_file_location(module_name, plugin_path)
+        if spec is None or spec.loader is None:
+            print(f"Failed to load spec for {plugin_path}")
+            return None
             
-        except Exception as e:
-            print(f"Error loading plugin {plugin_path}: {e}")
+        module = importlib.util.module_from_spec(spec)
+        with self.modules.track(plugin_path, os.path.dirname(plugin_path)):
+            spec.loader.exec_module(module)
+        
+        # Look for plugin class
+        found = find_plugin_class(module)
+        if found is None:
+            return None
+        item_name, item = found
+
+        # Create plugin instance
+        plugin = item()
+        metadata = plugin.get_metadata()
+        return metadata.get('name', item_name), plugin
+
+    def _create_remote_plugin(self, plugin_path: str) -> Optional[Tuple[str, Any]]:
+        """Load a plugin file in a host process and return a proxy for it."""
+        host = self.hosts.host_for(plugin_path)
+        loaded = host.load(plugin_path)
+        if loaded is None:
+            return None
+        plugin_name, metadata, commands = loaded
+        return plugin_name, RemotePlugin(host, plugin_path, metadata, commands)
     
     def get_plugin(self, name: str) -> Optional[Any]:
         """Get a plugin by name."""
         return self.plugins.get(name)
+
+    def get_plugin_info(self, name: str) -> Dict[str, Any]:
+        """Return a plugin's metadata and commands, from the index when possible."""
+        for plugin_path, known in list(self.plugin_files.items()):
+            if known.plugin_name == name:
+                entry = self.index.get(plugin_path)
+                if entry and entry['valid'] and entry['digest'] == known.digest:
+                    return {'metadata': entry['metadata'], 'commands': entry['commands']}
+                break
+        plugin = self.get_plugin(name)
+        if plugin is None:
+            return {'metadata': {}, 'commands': {}}
+        return {'metadata': plugin.get_metadata(), 'commands': plugin.get_commands()}
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Return the plugin index's entry count and hit rate."""
+        return self.index.stats()
     
     def execute_command(self, plugin_name: str, command: str, *args, **kwargs) -> bool:
         """Execute a command on a specific plugin."""
@@ -104,44 +721,93 @@ class PluginLoader:
         if plugin and hasattr(plugin, 'is_active') and plugin.is_active():
             return plugin.execute_command(command, *args, **kwargs)
         return False
+
+    def execute_command_async(self, plugin_name: str, command: str, *args,
+                              cancel_token: Optional[CancellationToken] = None,
+                              progress: Optional[Callable[[Any], None]] = None,
+                              **kwargs) -> Future:
+        """Execute a command on a worker thread and return its Future.
+
+        The Future's result is what ``execute_command`` would have returned.
+        ``cancel_token`` and ``progress`` are handed to plugins that declare
+        those parameters. Completion is also signalled by ``command_runner``.
+        Use ``asyncio.wrap_future`` to await it from a coroutine.
+        """
+        def resolve() -> Optional[Any]:
+            plugin = self.get_plugin(plugin_name)
+            if plugin and hasattr(plugin, 'is_active') and plugin.is_active():
+                return plugin
+            return None
+        return self.command_runner.submit(resolve, command, args, kwargs, cancel_token, progress)
+
+    def execute_qualified_command(self, name: str, *args, **kwargs) -> Any:
+        """Execute a command by qualified name (``Plugin.command``) via the command index."""
+        entry = self.command_index.lookup(name)
+        if entry and self.command_index.is_active(entry.plugin_name):
+            return entry.plugin.execute_command(entry.command, *args, **kwargs)
+        return False
+
+    def get_command_count(self) -> int:
+        """Number of commands offered by active plugins."""
+        return self.command_index.count()
+
+    def list_commands(self, plugin_name: Optional[str] = None,
+                      active_only: bool = True) -> List[CommandEntry]:
+        """List indexed commands, optionally for one plugin."""
+        return self.command_index.commands(plugin_name, active_only)
     
     def set_plugin_active(self, plugin_name: str, active: bool) -> bool:
         """Set a plugin's active state."""
-        plugin = self.plugins.get(plugin_name)
-        if plugin and hasattr(plugin, '_active'):
-            # Save state to settings
-            self.settings.setValue(f'plugins/{plugin_name}/active', active)
-            self.settings.sync()  # Force save settings
-            
-            # Update plugin state
-            plugin._active = active
-            return True
-        return False
+        return bool(self.set_plugins_active({plugin_name: active}))
+
+    def set_plugins_active(self, states: Dict[str, bool]) -> List[str]:
+        """Set several plugins' active states and save them in one batch.
+
+        Returns the names of the plugins that were updated; unknown plugins
+        are skipped.
+        """
+        updated = {}
+        for plugin_name, active in states.items():
+            plugin = self.plugins.get(plugin_name)
+            if plugin and hasattr(plugin, '_active'):
+                # Update plugin state
+                plugin._active = active
+                self.command_index.set_active(plugin_name, active)
+                updated[plugin_name] = active
+        # Save states; written to settings after a short delay
+        self.state.set_many(updated)
+        return list(updated)
     
     def uninstall_plugin(self, plugin_name: str) -> bool:
         """Uninstall a plugin by name."""
+        with self._lock:
+            return self._uninstall_plugin(plugin_name)
+
+    def _uninstall_plugin(self, plugin_name: str) -> bool:
         try:
             # Find the plugin file
             plugin = self.plugins.get(plugin_name)
             if not plugin:
                 return False
                 
-            for directory in self.plugin_directories:
-                module_name = plugin.__class__.__module__
-                expected_file = f"{module_name}.py"
-                plugin_path = os.path.join(directory, expected_file)
-                
+            plugin_paths = [path for path, known in self.plugin_files.items()
+                            if known.plugin_name == plugin_name]
+            for plugin_path in plugin_paths:
                 if os.path.exists(plugin_path):
                     # Cleanup plugin
                     if hasattr(plugin, 'cleanup'):
                         plugin.cleanup()
                     
                     # Remove from plugins dict
-                    del self.plugins[plugin_name]
+                    self.plugins = {name: other for name, other in self.plugins.items()
+                                    if name != plugin_name}
+                    self.plugin_files.pop(plugin_path, None)
+                    self.command_index.remove(plugin_name)
+                    self.index.remove(plugin_path)
+                    self.index.save()
                     
-                    # Remove module from sys.modules
-                    if module_name in sys.modules:
-                        del sys.modules[module_name]
+                    # Remove its modules from sys.modules
+                    self.modules.purge(plugin_path)
                     
                     # Remove the file
                     os.remove(plugin_path)
@@ -167,7 +833,7 @@ class PluginLoader:
             self.add_plugin_directory(target_directory)
             
             # Reload plugins
-            self.load_plugins()
+            self.reload_in_background()
             return True
         except Exception as e:
             print(f"Error installing plugin from {source_path}: {e}")
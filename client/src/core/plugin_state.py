@@ -0,0 +1,81 @@
+import threading
+from typing import Dict, Optional
+from PyQt6.QtCore import QSettings
+
+
+class PluginStateStore:
+    """Plugin active flags, read from QSettings once and written back in batches.
+
+    Reads are served from memory. Changes mark the plugin dirty and (re)start
+    a ``delay`` second timer; when it fires, every dirty flag is written and
+    the settings are synced once, so toggling many plugins costs one write.
+    ``flush`` writes immediately and must be called before exit.
+    """
+
+    def __init__(self, settings: QSettings, delay: float = 0.5):
+        self.settings = settings
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._active: Dict[str, bool] = {}
+        self._dirty: Dict[str, bool] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._load()
+
+    def is_active(self, plugin_name: str, default: bool = True) -> bool:
+        """Return a plugin's saved active flag."""
+        with self._lock:
+            return self._active.get(plugin_name, default)
+
+    def set_active(self, plugin_name: str, active: bool) -> None:
+        """Save a plugin's active flag with the next batch."""
+        self.set_many({plugin_name: active})
+
+    def set_many(self, states: Dict[str, bool]) -> None:
+        """Save several active flags with the next batch."""
+        with self._lock:
+            for plugin_name, active in states.items():
+                if self._active.get(plugin_name) != active:
+                    self._active[plugin_name] = active
+                    self._dirty[plugin_name] = active
+            if not self._dirty:
+                return
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def pending_count(self) -> int:
+        """Return the number of flags not yet written."""
+        with self._lock:
+            return len(self._dirty)
+
+    def flush(self) -> None:
+        """Write all pending flags now."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+                dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                return
+            for plugin_name, active in dirty.items():
+                self.settings.setValue(f'plugins/{plugin_name}/active', active)
+            # QSettings replaces the settings file as a whole
+            self.settings.sync()
+            if self.settings.status() != QSettings.Status.NoError:
+                print(f"Error saving plugin states: {self.settings.status()}")
+                with self._lock:
+                    # Keep them for the next attempt unless they changed meanwhile
+                    for plugin_name, active in dirty.items():
+                        self._dirty.setdefault(plugin_name, active)
+
+    def _load(self) -> None:
+        self.settings.beginGroup('plugins')
+        try:
+            for plugin_name in self.settings.childGroups():
+                self._active[plugin_name] = self.settings.value(f'{plugin_name}/active', True, type=bool)
+        finally:
+            self.settings.endGroup()
@@ -0,0 +1,106 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+from PyQt6.QtCore import QFileSystemWatcher, QObject, Qt, QTimer, pyqtSignal
+
+
+class PluginWatcher(QObject):
+    """Hot-reloads plugins when files in the plugin directories change.
+
+    Directories are watched for added, removed and renamed files, and each
+    plugin file for in-place edits. Events restart a ``debounce_ms`` timer,
+    so a burst (an editor save, copying many files) leads to one incremental
+    ``PluginLoader.load_plugins`` call, run on a worker thread. Changes seen
+    while a reload runs trigger one more reload afterwards. Signals are
+    delivered on the thread that created the watcher.
+    """
+
+    reload_started = pyqtSignal()
+    plugins_reloaded = pyqtSignal(object)  # Emitted with the load_plugins report
+    reload_failed = pyqtSignal(str)
+
+    _reload_done = pyqtSignal(object)
+    _reload_requested = pyqtSignal()
+
+    def __init__(self, loader: Any, debounce_ms: int = 300, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='yams-plugin-reload')
+        self._running = False
+        self._pending = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._start_reload)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_changed)
+        self._watcher.fileChanged.connect(self._on_changed)
+
+        # Queued so results are handled on this object's thread, not the worker's
+        self._reload_done.connect(self._finish_reload, Qt.ConnectionType.QueuedConnection)
+        self._reload_requested.connect(self.schedule_reload, Qt.ConnectionType.QueuedConnection)
+        self.sync_paths()
+
+    def sync_paths(self) -> None:
+        """Watch every plugin directory and known plugin file, and nothing else."""
+        wanted = set(self.loader.plugin_directories) | set(self.loader.plugin_files)
+        watched = set(self._watcher.directories()) | set(self._watcher.files())
+        stale = watched - wanted
+        if stale:
+            self._watcher.removePaths(list(stale))
+        missing = wanted - watched
+        if missing:
+            self._watcher.addPaths(list(missing))
+
+    def schedule_reload(self) -> None:
+        """Reload after the debounce interval, unless more changes arrive first."""
+        self._timer.start()
+
+    def request_reload(self) -> None:
+        """Like ``schedule_reload``, but safe to call from any thread."""
+        self._reload_requested.emit()
+
+    def reload_now(self) -> None:
+        """Start a background reload without waiting for the debounce interval."""
+        self._timer.stop()
+        self._start_reload()
+
+    def stop(self) -> None:
+        """Stop watching and wait for a running reload to finish."""
+        self._timer.stop()
+        paths = self._watcher.directories() + self._watcher.files()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._executor.shutdown(wait=True)
+
+    def _on_changed(self, path: str) -> None:
+        self.schedule_reload()
+
+    def _start_reload(self) -> None:
+        if self._running:
+            self._pending = True
+            return
+        self._running = True
+        self.reload_started.emit()
+        future = self._executor.submit(self.loader.load_plugins)
+        future.add_done_callback(self._reload_done.emit)
+
+    def _finish_reload(self, future: Future) -> None:
+        self._running = False
+        # Editors often replace files on save, which drops the file watch
+        self.sync_paths()
+
+        error = future.exception()
+        if error is not None:
+            print(f"Plugin hot reload error: {error}")
+            self.reload_failed.emit(str(error))
+        else:
+            report = future.result()
+            # Timings also cover plugins that finished loading after a deadline
+            if report['added'] or report['changed'] or report['removed'] or report['timings']:
+                self.plugins_reloaded.emit(report)
+
+        if self._pending:
+            self._pending = False
+            self.schedule_reload()
@@ -0,0 +1,273 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from .db_backends import SQLiteBackend, StorageBackend
+from .db_statements import StatementRegistry
+from .metrics import metrics
+
+REPLICA_SCHEMA_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', '..', 'database', 'replica_sqlite.sql'))
+
+# table -> (replicated columns, key columns, column naming the owning user)
+REPLICATED_TABLES = {
+    'users': (
+        ('id', 'username', 'email', 'password_hash', 'created_at', 'last_login',
+         'is_active', 'client_id', 'client_secret', 'updated_at'),
+        ('id',), 'id'
+    ),
+    'devices': (
+        ('id', 'user_id', 'name', 'device_id', 'last_seen', 'created_at', 'is_active', 'updated_at'),
+        ('id',), 'user_id'
+    ),
+    'user_plugins': (
+        ('user_id', 'plugin_id', 'purchase_date', 'is_installed', 'last_used', 'updated_at'),
+        ('user_id', 'plugin_id'), 'user_id'
+    )
+}
+
+
+class LocalReplica:
+    """Local SQLite copy of the server rows belonging to followed users.
+
+    Each sync pulls only the rows whose ``updated_at`` is at or after the
+    newest one already copied for that user and table, so a sync with no
+    changes costs one indexed query per table. Each pull starts ``overlap``
+    seconds before the watermark: ``updated_at`` is set when a statement
+    starts, so a transaction committing after a sync may carry an older
+    timestamp than rows already copied. Rows deleted on the server leave no
+    ``updated_at`` trail, and transactions longer than the overlap can still
+    slip past; both are caught by comparing keys and ``updated_at`` every
+    ``reconcile_every`` syncs. Replica tables use the server's names, so the
+    named statements in ``statements`` run unchanged against either side.
+    """
+
+    def __init__(self, remote: StorageBackend, statements: Dict[str, str],
+                 path: Optional[str] = None, interval: float = 30.0, batch_size: int = 1000,
+                 reconcile_every: int = 10, overlap: float = 60.0, is_online: Optional[Callable[[], bool]] = None,
+                 observer: Optional[Callable[..., None]] = None):
+        self.remote = remote
+        # ~/.yams is ours to lock down; the directory of a configured path is not
+        own_directory = path is None
+        path = path or os.path.join(os.path.expanduser('~'), '.yams', 'replica.db')
+        _make_private(path, own_directory)
+        self.store = SQLiteBackend(path, schema_path=REPLICA_SCHEMA_PATH)
+        self.statements = StatementRegistry(
+            {f'replica.{name}': sql for name, sql in self.store.statements(statements).items()},
+            prepared=False, observer=observer
+        )
+        self.interval = interval
+        self.batch_size = batch_size
+        self.reconcile_every = reconcile_every
+        self.overlap = timedelta(seconds=overlap)
+        self.is_online = is_online or (lambda: True)
+        self._syncs = 0
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def read(self, name: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """Run a named read-only statement against the replica."""
+        with self.store.connection() as conn:
+            return self.statements.execute(conn, f'replica.{name}', params).rows
+
+    def follow(self, user_id: int) -> None:
+        """Start replicating a user's rows; the first sync runs in the background."""
+        query = self.store.sql(
+            "INSERT INTO replica_watermarks (user_id, table_name) VALUES (%s, %s) "
+            "ON CONFLICT (user_id, table_name) DO NOTHING"
+        )
+        with self.store.connection() as conn:
+            conn.executemany(query, [(user_id, table) for table in REPLICATED_TABLES])
+        self.request_sync()
+
+    def followed(self) -> List[int]:
+        """List the users whose rows are replicated."""
+        with self.store.connection() as conn:
+            rows = conn.execute("SELECT DISTINCT user_id FROM replica_watermarks").fetchall()
+        return [row[0] for row in rows]
+
+    def has_user(self, user_id: int) -> bool:
+        """Check whether a user's rows have been fully copied at least once."""
+        with self.store.connection() as conn:
+            synced = conn.execute(
+                "SELECT COUNT(*) FROM replica_watermarks WHERE user_id = ? AND synced_at IS NOT NULL",
+                (user_id,)
+            ).fetchone()[0]
+            present = conn.execute("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone()
+        return synced == len(REPLICATED_TABLES) and present is not None
+
+    def request_sync(self) -> None:
+        """Run a sync in the background as soon as possible."""
+        self._wake.set()
+
+    def sync(self, user_id: Optional[int] = None) -> Dict[str, int]:
+        """Pull changed rows for one or all followed users; return rows copied per table."""
+        with self._sync_lock:
+            self._syncs += 1
+            reconcile = self._syncs % self.reconcile_every == 1 or self.reconcile_every == 1
+            copied = {table: 0 for table in REPLICATED_TABLES}
+            with metrics.timer('replica.sync'):
+                for followed in ([user_id] if user_id is not None else self.followed()):
+                    for table in REPLICATED_TABLES:
+                        copied[table] += self._pull(followed, table)
+                        if reconcile:
+                            self._reconcile(followed, table)
+            return copied
+
+    def start(self) -> None:
+        """Sync every ``interval`` seconds, or when requested, in the background."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name='yams-replica', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sync thread."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        """Stop syncing and close the replica database."""
+        self.stop()
+        self.store.close()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            # During an outage reads are served from what is already here
+            if not self.is_online():
+                continue
+            try:
+                self.sync()
+            except self.remote.connection_errors as e:
+                print(f"Replica sync paused: {e}")
+            except Exception as e:
+                print(f"Replica sync error: {e}")
+
+    def _pull(self, user_id: int, table: str, since: Optional[datetime] = None) -> int:
+        """Copy a user's rows in ``table`` changed since the stored watermark, or ``since``."""
+        columns, key_columns, owner = REPLICATED_TABLES[table]
+        with self.store.connection() as local:
+            watermark = local.execute(
+                "SELECT watermark FROM replica_watermarks WHERE user_id = ? AND table_name = ?",
+                (user_id, table)
+            ).fetchone()
+        watermark = _as_datetime(watermark[0]) if watermark else None
+
+        # ">=" and the overlap re-read rows already copied; the upsert makes
+        # that harmless, and late commits with older timestamps are not lost.
+        start = since if since is not None else (
+            watermark - self.overlap if watermark is not None else None)
+        query = f"SELECT {', '.join(columns)} FROM {table} WHERE {owner} = %s"
+        params: List[Any] = [user_id]
+        if start is not None:
+            query += " AND updated_at >= %s"
+            params.append(start)
+        query += " ORDER BY updated_at"
+
+        upsert = self.store.sql(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+            + self.store.upsert_clause(key_columns, [c for c in columns if c not in key_columns])
+        )
+        updated_index = columns.index('updated_at')
+        copied = 0
+        newest = watermark
+
+        with self.remote.connection() as remote, self.store.connection() as local:
+            cursor = remote.cursor()
+            try:
+                cursor.execute(self.remote.sql(query), params)
+                while True:
+                    rows = cursor.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    self.store.begin(local)
+                    try:
+                        local.executemany(upsert, rows)
+                        local.commit()
+                    except Exception:
+                        local.rollback()
+                        raise
+                    copied += len(rows)
+                    last = _as_datetime(rows[-1][updated_index])
+                    if last is not None and (newest is None or last > newest):
+                        newest = last
+            finally:
+                cursor.close()
+
+            local.execute(
+                "UPDATE replica_watermarks SET watermark = ?, synced_at = ? "
+                "WHERE user_id = ? AND table_name = ?",
+                (newest, datetime.now(), user_id, table)
+            )
+        metrics.increment('replica.rows_copied', copied)
+        return copied
+
+    def _reconcile(self, user_id: int, table: str) -> None:
+        """Delete rows gone from the server and re-copy rows the pulls missed."""
+        _, key_columns, owner = REPLICATED_TABLES[table]
+        query = f"SELECT {', '.join(key_columns)}, updated_at FROM {table} WHERE {owner} = %s"
+        with self.remote.connection() as remote:
+            cursor = remote.cursor()
+            try:
+                cursor.execute(self.remote.sql(query), (user_id,))
+                remote_rows = {tuple(row[:-1]): _as_datetime(row[-1]) for row in cursor.fetchall()}
+            finally:
+                cursor.close()
+
+        with self.store.connection() as local:
+            local_rows = {tuple(row[:-1]): _as_datetime(row[-1])
+                          for row in local.execute(self.store.sql(query), (user_id,)).fetchall()}
+            deleted = local_rows.keys() - remote_rows.keys()
+            if deleted:
+                condition = ' AND '.join(f'{column} = ?' for column in key_columns)
+                local.executemany(f"DELETE FROM {table} WHERE {condition}", list(deleted))
+                metrics.increment('replica.rows_deleted', len(deleted))
+
+        # Missing or older locally: committed behind a watermark already passed
+        stale = [updated for key, updated in remote_rows.items()
+                 if updated is not None and local_rows.get(key) != updated]
+        if stale:
+            metrics.increment('replica.rows_stale', len(stale))
+            self._pull(user_id, table, since=min(stale))
+
+
+def _make_private(path: str, own_directory: bool = False) -> None:
+    """Restrict the replica to the current user; it holds password hashes and client secrets.
+
+    The directory is only tightened if it is ``own_directory`` or created
+    here, so a path like /tmp/replica.db leaves /tmp alone.
+    """
+    if path == ':memory:':
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory, mode=0o700)
+        own_directory = True
+    if own_directory:
+        os.chmod(directory, 0o700)
+    # SQLite gives its -wal and -shm files the database file's permissions
+    os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            try:
+                os.chmod(path + suffix, 0o600)
+            except OSError as e:
+                print(f"Could not restrict permissions of {path + suffix}: {e}")
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Timestamps may come back as strings, depending on driver and backend."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
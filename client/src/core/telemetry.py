@@ -0,0 +1,276 @@
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Optional
+from .metrics import metrics
+
+DAY = 86400
+
+# name, bucket width in seconds, table, source table (None = raw samples)
+RollupTier = namedtuple('RollupTier', ['name', 'seconds', 'table', 'source'])
+
+TIERS = (
+    RollupTier('1m', 60, 'device_metrics_1m', None),
+    RollupTier('1h', 3600, 'device_metrics_1h', 'device_metrics_1m'),
+    RollupTier('1d', DAY, 'device_metrics_1d', 'device_metrics_1h')
+)
+
+METRIC_COLUMNS = ('cpu', 'memory', 'disk')
+ROLLUP_COLUMNS = ('samples',) + tuple(
+    f'{metric}_{kind}' for metric in METRIC_COLUMNS for kind in ('avg', 'max'))
+
+
+class TelemetryStore:
+    """Device CPU/memory/disk history with 1-minute, 1-hour and 1-day rollups.
+
+    Raw samples land in ``device_metrics_raw``. ``run_rollups`` folds closed
+    time buckets into the next coarser tier (raw -> 1m -> 1h -> 1d) and
+    ``apply_retention`` expires each tier after its own retention period, so
+    long-range dashboard queries read a few hundred rollup rows instead of
+    millions of samples. Timestamps are epoch seconds throughout.
+    """
+
+    def __init__(self, backend, interval: float = 60.0, lag: int = 30):
+        self.backend = backend
+        self.interval = interval
+        # Seconds to wait after a bucket closes so late samples still count
+        self.lag = lag
+        self.retention = {
+            'raw': int(os.getenv('TELEMETRY_RAW_RETENTION_DAYS', '2')) * DAY,
+            '1m': int(os.getenv('TELEMETRY_1M_RETENTION_DAYS', '14')) * DAY,
+            '1h': int(os.getenv('TELEMETRY_1H_RETENTION_DAYS', '180')) * DAY,
+            '1d': int(os.getenv('TELEMETRY_1D_RETENTION_DAYS', '1825')) * DAY
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record_samples(self, samples: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """Store raw samples and return how many were written.
+
+        Each sample is a dict with ``device_id`` (``devices.id``) and any of
+        ``cpu``, ``memory`` and ``disk``; ``ts`` defaults to now. The iterable
+        is consumed one chunk at a time.
+        """
+        query = self.backend.sql(
+            "INSERT INTO device_metrics_raw (device_id, ts, cpu, memory, disk) "
+            "VALUES (%s, %s, %s, %s, %s) " + self.backend.upsert_clause(('device_id', 'ts'), METRIC_COLUMNS)
+        )
+        samples = iter(samples)
+        written = 0
+        while True:
+            now = int(time.time())
+            rows = [
+                (sample['device_id'], int(sample.get('ts') or now),
+                 sample.get('cpu'), sample.get('memory'), sample.get('disk'))
+                for sample in islice(samples, chunk_size)
+            ]
+            if not rows:
+                return written
+            with self.backend.connection() as conn:
+                self.backend.begin(conn)
+                cursor = conn.cursor()
+                try:
+                    cursor.executemany(query, rows)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            written += len(rows)
+
+    def query(self, device_id: int, start: int, end: int, max_points: int = 500) -> Dict[str, Any]:
+        """Get a device's metrics between two epoch times at a fitting resolution.
+
+        Picks the finest tier that returns at most ``max_points`` buckets and
+        still covers ``start`` under its retention policy.
+        """
+        now = int(time.time())
+        tier = TIERS[-1]
+        for candidate in TIERS:
+            if ((end - start) / candidate.seconds <= max_points
+                    and start >= now - self.retention[candidate.name]):
+                tier = candidate
+                break
+
+        columns = ', '.join(ROLLUP_COLUMNS)
+        query = self.backend.sql(
+            f"SELECT bucket_start, {columns} FROM {tier.table} "
+            "WHERE device_id = %s AND bucket_start >= %s AND bucket_start < %s "
+            "ORDER BY bucket_start"
+        )
+        with self.backend.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, (device_id, start - start % tier.seconds, end))
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+
+        keys = ('bucket_start',) + ROLLUP_COLUMNS
+        return {'tier': tier.name, 'points': [dict(zip(keys, row)) for row in rows]}
+
+    def run_rollups(self, now: Optional[int] = None) -> Dict[str, int]:
+        """Roll closed buckets up through every tier; return buckets written per tier."""
+        now = int(time.time()) if now is None else now
+        written = {}
+        for tier in TIERS:
+            with metrics.timer(f'telemetry.rollup_{tier.name}'):
+                written[tier.name] = self._rollup(tier, now)
+        return written
+
+    def apply_retention(self, now: Optional[int] = None) -> None:
+        """Expire raw samples and rollups older than their retention period."""
+        now = int(time.time()) if now is None else now
+        with self.backend.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if self.backend.supports_partitioning:
+                    self._maintain_partitions(cursor, now)
+                else:
+                    cursor.execute(self.backend.sql("DELETE FROM device_metrics_raw WHERE ts < %s"),
+                                   (now - self.retention['raw'],))
+                for tier in TIERS:
+                    cursor.execute(self.backend.sql(f"DELETE FROM {tier.table} WHERE bucket_start < %s"),
+                                   (now - self.retention[tier.name],))
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def start(self) -> None:
+        """Run rollups and retention every ``interval`` seconds in the background."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='yams-telemetry', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background rollup thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_rollups()
+                self.apply_retention()
+            except Exception as e:
+                print(f"Telemetry rollup error: {e}")
+
+    def _rollup(self, tier: RollupTier, now: int) -> int:
+        """Aggregate the source of ``tier`` from its watermark up to the last closed bucket."""
+        end = (now - self.lag) - (now - self.lag) % tier.seconds
+        source_name = 'raw' if tier.source is None else TIERS[TIERS.index(tier) - 1].name
+        bucket = f'{{column}} - ({{column}} % {tier.seconds})'
+
+        if tier.source is None:
+            time_column = 'ts'
+            aggregates = 'COUNT(*), ' + ', '.join(
+                f'AVG({metric}), MAX({metric})' for metric in METRIC_COLUMNS)
+            source_table = 'device_metrics_raw'
+        else:
+            time_column = 'bucket_start'
+            # Weight the finer tier's averages by their sample counts, leaving
+            # out buckets without that metric so a gap does not pull it down
+            aggregates = 'SUM(samples), ' + ', '.join(
+                f'SUM({metric}_avg * samples) / '
+                f'SUM(CASE WHEN {metric}_avg IS NOT NULL THEN samples END), MAX({metric}_max)'
+                for metric in METRIC_COLUMNS)
+            source_table = tier.source
+
+        query = self.backend.sql(
+            f"INSERT INTO {tier.table} (device_id, bucket_start, {', '.join(ROLLUP_COLUMNS)}) "
+            f"SELECT device_id, {bucket.format(column=time_column)} AS bucket, {aggregates} "
+            f"FROM {source_table} WHERE {time_column} >= %s AND {time_column} < %s "
+            f"GROUP BY device_id, bucket "
+            + self.backend.upsert_clause(('device_id', 'bucket_start'), ROLLUP_COLUMNS)
+        )
+        watermark_query = self.backend.sql(
+            "INSERT INTO telemetry_rollups (tier, rolled_up_to) VALUES (%s, %s) "
+            + self.backend.upsert_clause(('tier',), ('rolled_up_to',))
+        )
+
+        with self.backend.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.backend.sql("SELECT rolled_up_to FROM telemetry_rollups WHERE tier = %s"),
+                               (tier.name,))
+                row = cursor.fetchone()
+                if row:
+                    start = row[0]
+                else:
+                    # First run: start from the oldest data the source still keeps
+                    oldest = now - self.retention[source_name]
+                    start = oldest - oldest % tier.seconds
+                if start >= end:
+                    return 0
+
+                self.backend.begin(conn)
+                try:
+                    cursor.execute(query, (start, end))
+                    written = cursor.rowcount
+                    cursor.execute(watermark_query, (tier.name, end))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                return written
+            finally:
+                cursor.close()
+
+    def _maintain_partitions(self, cursor, now: int) -> None:
+        """Keep daily partitions on the raw table: create tomorrow's, drop expired ones."""
+        cursor.execute("""
+            SELECT partition_name, partition_description FROM information_schema.partitions
+            WHERE table_schema = DATABASE() AND table_name = 'device_metrics_raw'
+                AND partition_name IS NOT NULL
+        """)
+        bounds = {name: description for name, description in cursor.fetchall()}
+
+        cutoff = now - self.retention['raw']
+        expired = [name for name, description in bounds.items()
+                   if description != 'MAXVALUE' and int(description) <= cutoff]
+        if expired:
+            cursor.execute(f"ALTER TABLE device_metrics_raw DROP PARTITION {', '.join(expired)}")
+
+        # Pre-create partitions for today and the next two days; ranges must
+        # keep increasing, so only days past the last existing bound qualify.
+        highest = max([int(description) for description in bounds.values()
+                       if description != 'MAXVALUE'], default=0)
+        today = now - now % DAY
+        new = []
+        for day in range(3):
+            upper = today + (day + 1) * DAY
+            if upper > highest:
+                name = 'p' + datetime.fromtimestamp(upper - DAY, timezone.utc).strftime('%Y%m%d')
+                new.append(f"PARTITION {name} VALUES LESS THAN ({upper})")
+        if new:
+            cursor.execute(
+                "ALTER TABLE device_metrics_raw REORGANIZE PARTITION p_future INTO "
+                f"({', '.join(new)}, PARTITION p_future VALUES LESS THAN MAXVALUE)"
+            )
+
+
+def main(argv=None) -> int:
+    """Run one rollup and retention pass, e.g. from cron."""
+    from .database import DatabaseManager
+
+    db = DatabaseManager()
+    try:
+        written = db.telemetry.run_rollups()
+        db.telemetry.apply_retention()
+        print(', '.join(f'{tier}: {count} buckets' for tier, count in written.items()))
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Any, Callable, ContextManager, Dict, Hashable, List, Optional, Tuple
+from .metrics import metrics
+
+
+class TimestampWriteBehind:
+    """Buffers "last touched" timestamp updates and writes them in bulk.
+
+    Each ``touch`` only records when a row was touched; repeated touches of
+    the same row coalesce so the latest one wins. A background thread
+    flushes the buffer every ``interval`` seconds with one ``UPDATE ... CASE``
+    statement per target. Timestamps are sent as an age relative to the
+    server's ``CURRENT_TIMESTAMP``, so client and server clocks or time zones
+    never need to agree. ``connection`` returns a context manager that
+    borrows a database connection, e.g. ``ConnectionPool.connection``;
+    ``sql`` and ``timestamp_ago`` adapt the generated SQL to the backend.
+    """
+
+    # target name -> (table, timestamp column, key columns)
+    TARGETS = {
+        'last_login': ('users', 'last_login', ('id',)),
+        'last_seen': ('devices', 'last_seen', ('device_id',)),
+        'last_used': ('user_plugins', 'last_used', ('user_id', 'plugin_id'))
+    }
+
+    def __init__(self, connection: Callable[[], ContextManager],
+                 sql: Callable[[str], str] = lambda query: query,
+                 timestamp_ago: str = 'CURRENT_TIMESTAMP - INTERVAL %s MICROSECOND',
+                 interval: float = 5.0, max_batch: int = 500,
+                 on_flushed: Optional[Callable[[str, List[Tuple]], None]] = None):
+        self.connection = connection
+        self.sql = sql
+        self.timestamp_ago = timestamp_ago
+        self.interval = interval
+        self.max_batch = max_batch
+        self.on_flushed = on_flushed
+        # target -> {key tuple: monotonic time of the latest touch}
+        self._pending: Dict[str, Dict[Tuple, float]] = {target: {} for target in self.TARGETS}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self, target: str, key: Any) -> None:
+        """Record that the row identified by ``key`` was touched just now."""
+        if target not in self.TARGETS:
+            raise ValueError(f"Unknown write-behind target: {target}")
+        key = key if isinstance(key, tuple) else (key,)
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending[target]
+            pending[key] = max(now, pending.get(key, now))
+
+    def pending_count(self) -> int:
+        """Return the number of buffered updates."""
+        with self._lock:
+            return sum(len(pending) for pending in self._pending.values())
+
+    def start(self) -> None:
+        """Start the periodic flush thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='yams-write-behind', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write out everything still buffered."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered updates now and return the number of rows sent."""
+        with self._flush_lock:
+            with self._lock:
+                batches = {target: pending for target, pending in self._pending.items() if pending}
+                self._pending = {target: {} for target in self.TARGETS}
+
+            written = 0
+            for target, pending in batches.items():
+                items = list(pending.items())
+                for start in range(0, len(items), self.max_batch):
+                    chunk = items[start:start + self.max_batch]
+                    try:
+                        with metrics.timer('write_behind.flush'):
+                            self._write(target, chunk)
+                    except Exception as e:
+                        print(f"Write-behind flush error for {target}: {e}")
+                        self._requeue(target, chunk)
+                        continue
+                    written += len(chunk)
+                    if self.on_flushed:
+                        self.on_flushed(target, [key for key, _ in chunk])
+            return written
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def _write(self, target: str, chunk: List[Tuple[Tuple, float]]) -> None:
+        table, column, key_columns = self.TARGETS[target]
+        condition = ' AND '.join(f'{key_column} = %s' for key_column in key_columns)
+        placeholders = '(' + ', '.join(['%s'] * len(key_columns)) + ')'
+
+        now = time.monotonic()
+        cases = []
+        params: List[Any] = []
+        for key, touched_at in chunk:
+            cases.append(f'WHEN {condition} THEN {self.timestamp_ago}')
+            params.extend(key)
+            params.append(int((now - touched_at) * 1_000_000))
+        for key, _ in chunk:
+            params.extend(key)
+
+        query = (
+            f"UPDATE {table} SET {column} = CASE {' '.join(cases)} ELSE {column} END "
+            f"WHERE ({', '.join(key_columns)}) IN ({', '.join([placeholders] * len(chunk))})"
+        )
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.sql(query), params)
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def _requeue(self, target: str, chunk: List[Tuple[Hashable, float]]) -> None:
+        """Put a failed chunk back without overwriting newer touches."""
+        with self._lock:
+            pending = self._pending[target]
+            for key, touched_at in chunk:
+                pending[key] = max(touched_at, pending.get(key, touched_at))
@@ -1,5 +1,6 @@
 import asyncio
 import json
+import multiprocessing
 import os
 import sys
 import websockets
@@ -51,4 +52,6 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # Needed for the password hashing worker processes in frozen builds
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -4,6 +4,7 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon
 from ..core.database import DatabaseManager
+from ..core.db_executor import DatabaseExecutor
 import uuid
 import secrets
 
@@ -78,6 +79,8 @@ class LoginWindow(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.db = DatabaseManager()
+        self.db_executor = DatabaseExecutor()
+        self.pending_task = None
         self.init_ui()
         self.setWindowTitle('YAMS - Login')
         self.setFixedSize(400, 500)
@@ -138,9 +141,9 @@ class LoginWindow(QDialog):
         login_layout.addSpacing(20)
         
         # Login button
-        login_button = ModernButton('Sign In', primary=True)
-        login_button.clicked.connect(self.login)
-        login_layout.addWidget(login_button)
+        self.login_button = ModernButton('Sign In', primary=True)
+        self.login_button.clicked.connect(self.login)
+        login_layout.addWidget(self.login_button)
         
         # Register link
         register_link = ModernButton('Create New Account', primary=False)
@@ -197,9 +200,9 @@ class LoginWindow(QDialog):
         register_layout.addSpacing(20)
         
         # Register button
-        register_button = ModernButton('Create Account', primary=True)
-        register_button.clicked.connect(self.register)
-        register_layout.addWidget(register_button)
+        self.register_button = ModernButton('Create Account', primary=True)
+        self.register_button.clicked.connect(self.register)
+        register_layout.addWidget(self.register_button)
         
         # Back to login button
         back_button = ModernButton('Back to Login', primary=False)
@@ -219,13 +222,37 @@ class LoginWindow(QDialog):
         main_layout.addWidget(self.stacked_widget)
         self.setLayout(main_layout)
     
+    def set_busy(self, button, busy_text):
+        """Show that a request is in flight and block resubmission."""
+        button.setProperty('idle_text', button.text())
+        button.setText(busy_text)
+        button.setEnabled(False)
+        button.setCursor(Qt.CursorShape.WaitCursor)
+
+    def set_idle(self, button):
+        """Restore a button after its request has finished."""
+        self.pending_task = None
+        button.setText(button.property('idle_text'))
+        button.setEnabled(True)
+        button.setCursor(Qt.CursorShape.PointingHandCursor)
+
     def login(self):
         """Handle login attempt."""
+        if self.pending_task:
+            return
+
         username = self.username_input.text()
         password = self.password_input.text()
         
-        # Get user info from database
-        user_info = self.db.authenticate_user(username, password)
+        # Authenticate on a worker thread so the dialog stays responsive
+        self.set_busy(self.login_button, 'Signing In...')
+        self.pending_task = self.db_executor.submit(self.db.authenticate_user, username, password)
+        self.pending_task.succeeded.connect(self.on_login_result)
+        self.pending_task.failed.connect(lambda error: self.on_login_result(None))
+        self.pending_task.finished.connect(lambda: self.set_idle(self.login_button))
+
+    def on_login_result(self, user_info):
+        """Handle the result of an authentication request."""
         if user_info:
             self.user_id = user_info['id']
             self.username = user_info['username']
@@ -233,11 +260,17 @@ class LoginWindow(QDialog):
             self.client_secret = user_info['client_secret']
             self.login_successful.emit(self.user_id)  # Emit the user ID
             self.accept()
+        elif not self.db.is_connected():
+            QMessageBox.warning(self, 'Login Failed',
+                                'Cannot reach the database, please try again shortly')
         else:
             QMessageBox.warning(self, 'Login Failed', 'Invalid credentials')
     
     def register(self):
         """Handle registration attempt."""
+        if self.pending_task:
+            return
+
         username = self.reg_username.text()
         password = self.reg_password.text()
         confirm_password = self.reg_confirm_password.text()
@@ -256,10 +289,16 @@ class LoginWindow(QDialog):
         client_id = str(uuid.uuid4())
         client_secret = secrets.token_urlsafe(32)
         
-        success, error = self.db.register_user(
-            username, password, email, client_id, client_secret
+        self.set_busy(self.register_button, 'Creating Account...')
+        self.pending_task = self.db_executor.submit(
+            self.db.register_user, username, password, email, client_id, client_secret
         )
-        
+        self.pending_task.succeeded.connect(lambda result: self.on_register_result(*result))
+        self.pending_task.failed.connect(lambda error: self.on_register_result(False, error))
+        self.pending_task.finished.connect(lambda: self.set_idle(self.register_button))
+
+    def on_register_result(self, success, error):
+        """Handle the result of a registration request."""
         if success:
             QMessageBox.information(
                 self,
@@ -277,6 +316,11 @@ class LoginWindow(QDialog):
     
     def closeEvent(self, event):
         """Handle window close event."""
+        # Drop any in-flight request so its result is not delivered to a closed dialog
+        if self.pending_task:
+            self.pending_task.cancel()
+            self.pending_task = None
+
         # If user clicks X button, reject the dialog which will close the app
         self.reject()
         event.accept()
@@ -12,15 +12,28 @@ from .auth_window import LoginWindow
 from .theme import ModernSidebarButton, ModernTabWidget, COLORS, ThemeManager
 from .resources import resources_rc  # Import the compiled resource file
 from ..core.database import DatabaseManager
+from ..core.db_executor import DatabaseExecutor
 import sys
 import asyncio
 import websockets
 import json
 import subprocess
 from ..core.plugin_loader import PluginLoader
-from .plugin_manager import PluginManagerDialog
 import darkdetect
 
+def describe_reload(report):
+    """One-line summary of a plugin reload report."""
+    reloaded = ', '.join(f"{name} ({seconds * 1000:.0f} ms)"
+                         for name, seconds in report.get('timings', {}).items())
+    parts = [f"Reloaded: {reloaded}"] if reloaded else []
+    if report.get('removed'):
+        parts.append(f"Removed: {len(report['removed'])}")
+    if report.get('slow'):
+        parts.append(f"Still loading: {len(report['slow'])}")
+    if report.get('failed'):
+        parts.append(f"Failed: {len(report['failed'])}")
+    return ' | '.join(parts) or "No plugin changes"
+
 class ServerListWidget(QListWidget):
     """Custom list widget that supports drag and drop of server names."""
     
@@ -91,6 +104,13 @@ class PluginManagerDialog(QDialog):
         self.plugin_list.dropEvent = self.dropEvent
         layout.addWidget(QLabel("Installed Plugins:"))
         layout.addWidget(self.plugin_list)
+
+        # What the last reload did and how well the plugin index is doing
+        self.reload_label = QLabel()
+        self.reload_label.setWordWrap(True)
+        layout.addWidget(self.reload_label)
+        if self.plugin_loader.watcher:
+            self.plugin_loader.watcher.plugins_reloaded.connect(self.show_reload_report)
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -122,6 +142,13 @@ class PluginManagerDialog(QDialog):
                 if os.path.isfile(item_path) and item.endswith('.py') and item != '__init__.py':
                     item = QListWidgetItem(item)
                     self.plugin_list.addItem(item)
+        self.show_reload_report(self.plugin_loader.last_reload)
+
+    def show_reload_report(self, report):
+        """Show the last plugin reload's timings and the index hit rate."""
+        index = self.plugin_loader.get_index_stats()
+        self.reload_label.setText(
+            describe_reload(report) + f" | Index: {index['entries']} entries, {index['hit_rate']:.0%} hit rate")
     
     def install_plugin(self):
         """Install a plugin from file."""
@@ -237,6 +264,10 @@ class PluginManagerDialog(QDialog):
                 self.install_plugin_file(file_path)
 
 class MainWindow(QMainWindow):
+    # Database connection state changes, re-emitted on the GUI thread
+    db_state_changed = pyqtSignal(str, str)
+    plugin_loaded = pyqtSignal(str)
+
     def __init__(self, user_info):
         super().__init__()
         self.server_url = "ws://localhost:8765"
@@ -256,6 +287,8 @@ class MainWindow(QMainWindow):
         
         # Initialize database
         self.db = DatabaseManager()
+        self.db_executor = DatabaseExecutor()
+        self.profile_task = None
         
         # Initialize settings
         self.settings = QSettings('Codeium', 'YAMS')
@@ -264,12 +297,22 @@ class MainWindow(QMainWindow):
         
         # Initialize plugin system
         self.plugin_loader = PluginLoader()
+        # Keep one reference to each listener: every ``.emit`` access makes a
+        # new bound method, which the remove_*listener calls would not recognise
+        self._plugin_loaded_listener = self.plugin_loaded.emit
+        self._db_state_listener = self.db_state_changed.emit
         
         # Set up UI
         self.init_ui()
         
         # Initialize plugins
         self.init_plugins()
+
+        # Show database health; the supervisor reports from its own thread,
+        # so go through a signal to update the status bar on the GUI thread
+        self.db_state_changed.connect(self.on_db_state_changed)
+        self.db.add_connection_listener(self._db_state_listener)
+        self.on_db_state_changed(self.db.connection_state(), '')
         
         # Apply theme after UI is initialized
         self.apply_theme()
@@ -469,6 +512,8 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Not connected to server")
+        self.db_status_label = QLabel()
+        self.status_bar.addPermanentWidget(self.db_status_label)
         
         # Connect buttons to show pages
         self.dashboard_btn.clicked.connect(lambda: self.show_page(0))
@@ -847,10 +892,13 @@ class MainWindow(QMainWindow):
             print("Login window rejected, quitting...")  # Debug print
             QApplication.quit()
             
-        # Get user info directly from database
-        db = DatabaseManager()
-        user_info = db.get_user_info(1)  # Hardcode to user ID 1 for now
-        
+        # Get user info from the database without blocking the event loop
+        task = self.db_executor.submit(self.db.get_user_info, 1)  # Hardcode to user ID 1 for now
+        task.succeeded.connect(self.on_login_user_info)
+        task.failed.connect(lambda error: self.on_login_user_info(None))
+
+    def on_login_user_info(self, user_info):
+        """Finish showing the main window once user info has loaded."""
         if user_info:
             print("Got user info from database:", user_info)  # Debug print
             self.username = user_info['username']
@@ -881,7 +929,32 @@ class MainWindow(QMainWindow):
         if not hasattr(self, 'info_labels'):
             print("Warning: info_labels not initialized")
             return
-            
+
+        # Show what we already have, then update once the database answers
+        self.update_profile_labels()
+
+        if self.user_id is None:
+            return
+        if self.profile_task:
+            self.profile_task.cancel()
+        self.profile_task = self.db_executor.submit(self.db.get_user_info, self.user_id)
+        self.profile_task.succeeded.connect(self.on_profile_loaded)
+        self.profile_task.failed.connect(lambda error: print(f"Error loading profile: {error}"))
+
+    def on_profile_loaded(self, user_info):
+        """Apply freshly loaded user info to the profile page."""
+        self.profile_task = None
+        if not user_info:
+            print("Failed to get user info from database")  # Debug print
+            return
+
+        self.username = user_info['username']
+        self.client_id = user_info['client_id']
+        self.client_secret = user_info['client_secret']
+        self.update_profile_labels()
+
+    def update_profile_labels(self):
+        """Update the profile labels from the current user info."""
         # Update all labels with user info
         print("Current user info:", {
             'username': getattr(self, 'username', None),
@@ -929,6 +1002,13 @@ class MainWindow(QMainWindow):
         """Quit the application cleanly."""
         # Save settings
         self.settings.sync()
+        # Stop background database work and flush buffered timestamp writes
+        self.db.remove_connection_listener(self._db_state_listener)
+        self.plugin_loader.remove_listener(self._plugin_loaded_listener)
+        self.plugin_loader.shutdown()
+        self.db_executor.shutdown()
+        self.db.flush_pending_writes()
+        self.db.close()
         # Hide tray icon
         if hasattr(self, 'tray_icon'):
             self.tray_icon.hide()
@@ -949,7 +1029,8 @@ class MainWindow(QMainWindow):
         plugin_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "extensions")
         dialog = PluginManagerDialog(self.plugin_loader, plugin_dir, parent=self)
         dialog.exec()  # We want to update regardless of dialog result
-        self.plugin_loader.load_plugins()  # Force reload all plugins
+        # Reload on the watcher's thread; load_plugins can block on slow plugins
+        self.plugin_loader.reload_in_background()
         self.update_plugin_lists()
 
     def update_plugin_lists(self):
@@ -961,7 +1042,6 @@ class MainWindow(QMainWindow):
             return
             
         active_count = 0
-        command_count = 0
         
         for plugin_name, plugin in self.plugin_loader.plugins.items():
             # Skip system plugins
@@ -980,7 +1060,6 @@ class MainWindow(QMainWindow):
                 status_label = QLabel("Active")
                 status_label.setStyleSheet("color: green;")
                 active_count += 1
-                command_count += len(plugin.get_commands())
                 self.active_plugins_list.addItem(item)
             else:
                 status_label = QLabel("Inactive")
@@ -1001,7 +1080,7 @@ class MainWindow(QMainWindow):
         total_plugins = len([p for p in self.plugin_loader.plugins if p != "loader"])
         self.total_plugins_label.setText(f"Total Plugins: {total_plugins}")
         self.active_count_label.setText(f"Active: {active_count}")
-        self.commands_count_label.setText(f"Available Commands: {command_count}")
+        self.commands_count_label.setText(f"Available Commands: {self.plugin_loader.get_command_count()}")
 
     async def connect_to_server(self):
         """Try to connect to the server."""
@@ -1060,6 +1139,16 @@ class MainWindow(QMainWindow):
             print(f"Error updating status: {e}")
             self.status_bar.showMessage("Error updating status")
 
+    def on_db_state_changed(self, state, detail):
+        """Show the database connection state in the status bar."""
+        labels = {
+            'connected': 'Database: Connected',
+            'connecting': 'Database: Connecting...',
+            'reconnecting': 'Database: Reconnecting...'
+        }
+        self.db_status_label.setText(labels.get(state, f'Database: {state}'))
+        self.db_status_label.setToolTip(detail)
+
     def toggle_theme(self):
         """Toggle between light and dark mode."""
         self.is_dark_mode = not self.is_dark_mode
@@ -1228,18 +1317,33 @@ class MainWindow(QMainWindow):
             # Add default plugin directories
             default_plugin_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "extensions")
             self.plugin_loader.add_plugin_directory(default_plugin_dir)
+
+            # Plugins finish loading on pool threads; refresh the lists on the GUI thread
+            self.plugin_loaded.connect(self.on_plugin_loaded)
+            self.plugin_loader.add_listener(self._plugin_loaded_listener)
             
-            # Load plugins
-            self.plugin_loader.load_plugins()
-            
-            # Update UI
+            # Reload plugins in the background when their files change
+            watcher = self.plugin_loader.enable_hot_reload()
+            watcher.plugins_reloaded.connect(self.on_plugins_hot_reloaded)
+
+            # Load plugins in the background so the window shows up right away
             self.update_plugin_lists()
+            watcher.reload_now()
             
         except Exception as e:
             print(f"Error initializing plugin system: {e}")
             import traceback
             traceback.print_exc()
 
+    def on_plugin_loaded(self, plugin_name):
+        """Show a plugin in the lists as soon as it has loaded."""
+        self.update_plugin_lists()
+
+    def on_plugins_hot_reloaded(self, report):
+        """Refresh the plugin lists after plugin files changed on disk."""
+        self.update_plugin_lists()
+        self.status_bar.showMessage(describe_reload(report), 5000)
+
 def create_gui():
     """Create and return the GUI application and main window."""
     app = QApplication.instance() or QApplication(sys.argv)
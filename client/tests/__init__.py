@@ -0,0 +1,4 @@
+"""
+YAMS Desktop Application
+Tests
+"""
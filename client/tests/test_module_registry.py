@@ -0,0 +1,132 @@
+"""
+Module ownership and purging for plugin reloads.
+
+    python -m pytest client/tests
+"""
+import importlib
+import os
+import sys
+import textwrap
+import threading
+
+import pytest
+from PyQt6.QtCore import QSettings
+
+from client.src.core.plugin_loader import ModuleRegistry, PluginLoader
+
+PLUGIN_SOURCE = textwrap.dedent('''
+    import yams_test_alpha_helper
+
+
+    class Alpha:
+        _active = True
+
+        def initialize(self):
+            return True
+
+        def cleanup(self):
+            pass
+
+        def is_active(self):
+            return self._active
+
+        def get_commands(self):
+            return {'value': 'Return the helper value'}
+
+        def execute_command(self, command, *args, **kwargs):
+            return yams_test_alpha_helper.VALUE
+
+        def get_metadata(self):
+            return {'name': 'Alpha', 'version': '1.0.0'}
+''')
+
+
+def write(path, source):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(source)
+
+
+@pytest.fixture
+def plugin_dir(tmp_path, monkeypatch):
+    directory = tmp_path / 'plugins'
+    directory.mkdir()
+    monkeypatch.syspath_prepend(str(directory))
+    yield directory
+    for name in [name for name, module in sys.modules.items()
+                 if str(tmp_path) in str(getattr(module, '__file__', None) or '')]:
+        del sys.modules[name]
+
+
+def test_purge_removes_owned_helper(plugin_dir):
+    write(plugin_dir / 'yams_test_owned.py', 'VALUE = 1\n')
+    owner = str(plugin_dir / 'alpha.py')
+    registry = ModuleRegistry()
+
+    with registry.track(owner, str(plugin_dir)):
+        importlib.import_module('yams_test_owned')
+
+    assert registry.owner_of('yams_test_owned') == owner
+    assert registry.purge(owner) == ['yams_test_owned']
+    assert 'yams_test_owned' not in sys.modules
+    assert len(registry) == 0
+
+
+def test_purge_keeps_unrelated_module_mentioning_the_path(plugin_dir, monkeypatch):
+    # A sibling directory whose path starts with the plugin directory's path
+    other_dir = plugin_dir.parent / 'plugins_extra'
+    other_dir.mkdir()
+    monkeypatch.syspath_prepend(str(other_dir))
+    write(other_dir / 'yams_test_unrelated.py', 'VALUE = 1\n')
+    owner = str(plugin_dir / 'alpha.py')
+    registry = ModuleRegistry()
+
+    with registry.track(owner, str(plugin_dir)):
+        module = importlib.import_module('yams_test_unrelated')
+
+    assert str(plugin_dir) in repr(module)
+    assert registry.owner_of('yams_test_unrelated') is None
+    registry.purge(owner)
+    assert 'yams_test_unrelated' in sys.modules
+
+
+def test_concurrent_imports_keep_their_owners(plugin_dir):
+    write(plugin_dir / 'yams_test_slow.py', 'import time\ntime.sleep(0.2)\n')
+    write(plugin_dir / 'yams_test_fast.py', 'VALUE = 1\n')
+    registry = ModuleRegistry()
+
+    def load(owner, name):
+        with registry.track(owner, str(plugin_dir)):
+            importlib.import_module(name)
+
+    slow = threading.Thread(target=load, args=('slow.py', 'yams_test_slow'))
+    slow.start()
+    load('fast.py', 'yams_test_fast')
+    slow.join()
+
+    assert registry.owned('slow.py') == {'yams_test_slow'}
+    assert registry.owned('fast.py') == {'yams_test_fast'}
+
+
+def test_helper_edit_reimports_helper(plugin_dir, tmp_path, monkeypatch):
+    QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, str(tmp_path))
+    QSettings.setPath(QSettings.Format.NativeFormat, QSettings.Scope.UserScope, str(tmp_path))
+    monkeypatch.setenv('PLUGIN_INDEX_PATH', str(tmp_path / 'plugin_index.json'))
+    helper = plugin_dir / 'yams_test_alpha_helper.py'
+    write(helper, 'VALUE = 1\n')
+    write(plugin_dir / 'yams_test_alpha.py', PLUGIN_SOURCE)
+
+    loader = PluginLoader()
+    try:
+        loader.add_plugin_directory(str(plugin_dir))
+        loader.load_plugins()
+        assert loader.execute_command('Alpha', 'value') == 1
+
+        write(helper, 'VALUE = 22\n')
+        stat = os.stat(helper)
+        os.utime(helper, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        report = loader.load_plugins()
+
+        assert str(plugin_dir / 'yams_test_alpha.py') in report['changed']
+        assert loader.execute_command('Alpha', 'value') == 22
+    finally:
+        loader.shutdown()
@@ -0,0 +1,12 @@
+-- Covering indexes for the dashboard queries (see INDEX_PLAN in
+-- client/src/core/migrations.py). InnoDB secondary indexes carry the
+-- primary key, so devices.id does not need to be listed.
+
+-- A user's devices, most recently seen first
+CREATE INDEX idx_devices_owner_seen ON devices (user_id, last_seen, is_active, name);
+
+-- Devices seen across the fleet since a point in time
+CREATE INDEX idx_devices_last_seen ON devices (last_seen, user_id);
+
+-- Users entitled to a plugin
+CREATE INDEX idx_user_plugins_plugin ON user_plugins (plugin_id, is_installed, user_id);
@@ -0,0 +1,7 @@
+-- Indexes matching the keyset pagination order of DatabaseManager.iter_devices.
+-- InnoDB appends the primary key to secondary indexes, so these cover the
+-- (last_seen, id) and (name, id) orderings per owner without a filesort.
+
+CREATE INDEX idx_devices_owner_keyset ON devices (user_id, last_seen);
+
+CREATE INDEX idx_devices_owner_name ON devices (user_id, name);
@@ -0,0 +1,66 @@
+-- Device telemetry: raw samples plus 1-minute, 1-hour and 1-day rollups.
+-- Timestamps are epoch seconds so bucketing is plain integer arithmetic.
+-- The raw table is range-partitioned by day; the telemetry job adds upcoming
+-- partitions and drops expired ones, which is far cheaper than DELETE.
+-- Partitioned InnoDB tables cannot have foreign keys, so device_id is not
+-- constrained; rows of deleted devices age out with the retention policy.
+
+CREATE TABLE IF NOT EXISTS device_metrics_raw (
+    device_id INT NOT NULL,
+    ts INT UNSIGNED NOT NULL,
+    cpu FLOAT NULL,
+    memory FLOAT NULL,
+    disk FLOAT NULL,
+    PRIMARY KEY (device_id, ts)
+) ENGINE=InnoDB
+PARTITION BY RANGE (ts) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE IF NOT EXISTS device_metrics_1m (
+    device_id INT NOT NULL,
+    bucket_start INT UNSIGNED NOT NULL,
+    samples INT UNSIGNED NOT NULL,
+    cpu_avg FLOAT NULL,
+    cpu_max FLOAT NULL,
+    memory_avg FLOAT NULL,
+    memory_max FLOAT NULL,
+    disk_avg FLOAT NULL,
+    disk_max FLOAT NULL,
+    PRIMARY KEY (device_id, bucket_start),
+    INDEX idx_device_metrics_1m_bucket (bucket_start)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS device_metrics_1h (
+    device_id INT NOT NULL,
+    bucket_start INT UNSIGNED NOT NULL,
+    samples INT UNSIGNED NOT NULL,
+    cpu_avg FLOAT NULL,
+    cpu_max FLOAT NULL,
+    memory_avg FLOAT NULL,
+    memory_max FLOAT NULL,
+    disk_avg FLOAT NULL,
+    disk_max FLOAT NULL,
+    PRIMARY KEY (device_id, bucket_start),
+    INDEX idx_device_metrics_1h_bucket (bucket_start)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS device_metrics_1d (
+    device_id INT NOT NULL,
+    bucket_start INT UNSIGNED NOT NULL,
+    samples INT UNSIGNED NOT NULL,
+    cpu_avg FLOAT NULL,
+    cpu_max FLOAT NULL,
+    memory_avg FLOAT NULL,
+    memory_max FLOAT NULL,
+    disk_avg FLOAT NULL,
+    disk_max FLOAT NULL,
+    PRIMARY KEY (device_id, bucket_start),
+    INDEX idx_device_metrics_1d_bucket (bucket_start)
+) ENGINE=InnoDB;
+
+-- How far each rollup tier has been computed (exclusive upper bound)
+CREATE TABLE IF NOT EXISTS telemetry_rollups (
+    tier VARCHAR(8) PRIMARY KEY,
+    rolled_up_to INT UNSIGNED NOT NULL
+) ENGINE=InnoDB;
@@ -0,0 +1,20 @@
+-- Row change timestamps for the client-side replica (client/src/core/replica.py),
+-- which pulls rows changed since its last watermark. Microsecond precision
+-- keeps the rows re-read at a watermark boundary to a minimum.
+
+ALTER TABLE users
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+ALTER TABLE devices
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+ALTER TABLE user_plugins
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+-- A user's rows changed since a watermark
+CREATE INDEX idx_devices_owner_updated ON devices (user_id, updated_at);
+
+CREATE INDEX idx_user_plugins_owner_updated ON user_plugins (user_id, updated_at);
@@ -0,0 +1,49 @@
+-- Local replica of the rows a signed-in user needs from the server, kept
+-- by client/src/core/replica.py. Table and column names match the server
+-- so the same queries run against either.
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username VARCHAR(50) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP NULL,
+    last_login TIMESTAMP NULL,
+    is_active BOOLEAN DEFAULT 1,
+    client_id VARCHAR(255) NOT NULL,
+    client_secret VARCHAR(255) NOT NULL,
+    updated_at TIMESTAMP NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);
+
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    device_id VARCHAR(255) NOT NULL,
+    last_seen TIMESTAMP NULL,
+    created_at TIMESTAMP NULL,
+    is_active BOOLEAN DEFAULT 1,
+    updated_at TIMESTAMP NULL
+);
+CREATE INDEX IF NOT EXISTS idx_devices_owner_keyset ON devices (user_id, last_seen);
+CREATE INDEX IF NOT EXISTS idx_devices_owner_name ON devices (user_id, name);
+
+CREATE TABLE IF NOT EXISTS user_plugins (
+    user_id INTEGER NOT NULL,
+    plugin_id INTEGER NOT NULL,
+    purchase_date TIMESTAMP NULL,
+    is_installed BOOLEAN DEFAULT 1,
+    last_used TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    PRIMARY KEY (user_id, plugin_id)
+) WITHOUT ROWID;
+
+-- Highest server updated_at copied per user and table
+CREATE TABLE IF NOT EXISTS replica_watermarks (
+    user_id INTEGER NOT NULL,
+    table_name VARCHAR(32) NOT NULL,
+    watermark TIMESTAMP NULL,
+    synced_at TIMESTAMP NULL,
+    PRIMARY KEY (user_id, table_name)
+) WITHOUT ROWID;
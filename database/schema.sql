@@ -1,4 +1,6 @@
 -- Create the database if it doesn't exist
+-- Indexes and later schema changes live in database/migrations and are
+-- applied with: python -m client.src.core.migrations
 CREATE DATABASE IF NOT EXISTS yams;
 USE yams;
 
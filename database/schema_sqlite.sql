@@ -0,0 +1,137 @@
+-- SQLite mirror of database/schema.sql plus the indexes and tables from
+-- database/migrations, used by the embedded storage backend.
+
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP NULL,
+    is_active BOOLEAN DEFAULT 1,
+    client_id VARCHAR(255) NOT NULL UNIQUE,
+    client_secret VARCHAR(255) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Devices table
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    device_id VARCHAR(255) NOT NULL UNIQUE,
+    last_seen TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_active BOOLEAN DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Plugins table
+CREATE TABLE IF NOT EXISTS plugins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    description TEXT,
+    version VARCHAR(50) NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (name, version)
+);
+
+-- User plugins table (for plugin settings per user)
+CREATE TABLE IF NOT EXISTS user_plugins (
+    user_id INTEGER NOT NULL,
+    plugin_id INTEGER NOT NULL,
+    purchase_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_installed BOOLEAN DEFAULT 1,
+    last_used TIMESTAMP NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, plugin_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (plugin_id) REFERENCES plugins(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Device telemetry (migration 004); SQLite has no partitioning, so raw
+-- samples are expired with DELETE
+
+CREATE TABLE IF NOT EXISTS device_metrics_raw (
+    device_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    cpu REAL NULL,
+    memory REAL NULL,
+    disk REAL NULL,
+    PRIMARY KEY (device_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_device_metrics_raw_ts ON device_metrics_raw (ts);
+
+CREATE TABLE IF NOT EXISTS device_metrics_1m (
+    device_id INTEGER NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    cpu_avg REAL NULL,
+    cpu_max REAL NULL,
+    memory_avg REAL NULL,
+    memory_max REAL NULL,
+    disk_avg REAL NULL,
+    disk_max REAL NULL,
+    PRIMARY KEY (device_id, bucket_start)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_device_metrics_1m_bucket ON device_metrics_1m (bucket_start);
+
+CREATE TABLE IF NOT EXISTS device_metrics_1h (
+    device_id INTEGER NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    cpu_avg REAL NULL,
+    cpu_max REAL NULL,
+    memory_avg REAL NULL,
+    memory_max REAL NULL,
+    disk_avg REAL NULL,
+    disk_max REAL NULL,
+    PRIMARY KEY (device_id, bucket_start)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_device_metrics_1h_bucket ON device_metrics_1h (bucket_start);
+
+CREATE TABLE IF NOT EXISTS device_metrics_1d (
+    device_id INTEGER NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    cpu_avg REAL NULL,
+    cpu_max REAL NULL,
+    memory_avg REAL NULL,
+    memory_max REAL NULL,
+    disk_avg REAL NULL,
+    disk_max REAL NULL,
+    PRIMARY KEY (device_id, bucket_start)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_device_metrics_1d_bucket ON device_metrics_1d (bucket_start);
+
+CREATE TABLE IF NOT EXISTS telemetry_rollups (
+    tier VARCHAR(8) PRIMARY KEY,
+    rolled_up_to INTEGER NOT NULL
+);
+
+-- Indexes (migrations 002, 003 and 005)
+CREATE INDEX IF NOT EXISTS idx_devices_owner_seen ON devices (user_id, last_seen, is_active, name);
+CREATE INDEX IF NOT EXISTS idx_devices_last_seen ON devices (last_seen, user_id);
+CREATE INDEX IF NOT EXISTS idx_user_plugins_plugin ON user_plugins (plugin_id, is_installed, user_id);
+CREATE INDEX IF NOT EXISTS idx_devices_owner_keyset ON devices (user_id, last_seen);
+CREATE INDEX IF NOT EXISTS idx_devices_owner_name ON devices (user_id, name);
+CREATE INDEX IF NOT EXISTS idx_devices_owner_updated ON devices (user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_user_plugins_owner_updated ON user_plugins (user_id, updated_at);
+
+-- updated_at maintenance (migration 005 uses ON UPDATE CURRENT_TIMESTAMP)
+CREATE TRIGGER IF NOT EXISTS trg_users_updated_at AFTER UPDATE ON users
+BEGIN
+    UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_devices_updated_at AFTER UPDATE ON devices
+BEGIN
+    UPDATE devices SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_user_plugins_updated_at AFTER UPDATE ON user_plugins
+BEGIN
+    UPDATE user_plugins SET updated_at = CURRENT_TIMESTAMP
+    WHERE user_id = NEW.user_id AND plugin_id = NEW.plugin_id;
+END;